@@ -0,0 +1,259 @@
+'''
+Benchmarks the search algorithms of maze.py on seeded, generated arenas and tracks regressions.
+
+    python3 benchmark.py -generators open maze random spiral -sizes 10 100 1000 -output results.json
+    python3 benchmark.py -sizes 10 100 1000 -baseline results.json
+    python3 benchmark.py -algorithms astar-heap astar-heap-g astar-bucket
+
+Every (generator, size, algorithm) case records its cost, nodes expanded, time and peak memory. The time is
+taken with memory tracking off and the memory in a second, tracked run. With a baseline, cases that got
+slower or bigger than the tolerance allows, or whose cost or nodes expanded changed, are reported and the
+script exits with status 1.
+'''
+import argparse
+import csv
+import functools
+import json
+import random
+import sys
+import time
+
+import maze
+
+try:
+    import numpy  # Imported here so that it is not in the time of the first case that uses it
+except ImportError:
+    pass
+
+
+def open_arena(size, rng):
+    '''
+    Returns a size x size arena with no obstacles, the start in the top left corner
+    and the goal in the bottom right one
+    '''
+    arena = [' ' * size for _ in range(size)]
+    return place_endpoints(arena, (0, 0), (size - 1, size - 1))
+
+
+def random_arena(size, rng, density=0.3):
+    '''
+    Returns a size x size arena where every cell is an obstacle with the given probability,
+    except for the start and goal corners. Arenas without a path from the start to the goal are drawn
+    again, so that every case compares searches that succeed.
+    '''
+    while True:
+        arena = [''.join('o' if rng.random() < density else ' ' for _ in range(size)) for _ in range(size)]
+        arena = place_endpoints(arena, (0, 0), (size - 1, size - 1))
+        grid = maze.Grid(arena)
+        labels = maze.component_labels(grid)
+        if labels[grid.start] == labels[grid.goal]:
+            return arena
+
+
+def perfect_maze(size, rng):
+    '''
+    Returns a size x size perfect maze (exactly one path between any two cells) carved by an iterative
+    recursive backtracker, from the top left corner to the bottom right cell of the carved lattice
+    '''
+    cells = [['o'] * size for _ in range(size)]
+    cells[0][0] = ' '
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        choices = [(row + dr, col + dc, dr // 2, dc // 2) for dr, dc in ((-2, 0), (0, 2), (2, 0), (0, -2))
+                   if 0 <= row + dr < size and 0 <= col + dc < size and cells[row + dr][col + dc] == 'o']
+        if not choices:
+            stack.pop()
+            continue
+        next_row, next_col, half_row, half_col = rng.choice(choices)
+        cells[row + half_row][col + half_col] = ' '
+        cells[next_row][next_col] = ' '
+        stack.append((next_row, next_col))
+
+    last = (size - 1) // 2 * 2
+    return place_endpoints([''.join(row) for row in cells], (0, 0), (last, last))
+
+
+def spiral_arena(size, rng):
+    '''
+    Returns a size x size arena whose only corridor spirals inwards from the top left corner to the
+    center, the worst case for searches guided by the Manhattan distance
+    '''
+    cells = [['o'] * size for _ in range(size)]
+    directions = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+    def inside(row, col):
+        return 0 <= row < size and 0 <= col < size
+
+    def is_wall(row, col):
+        return inside(row, col) and cells[row][col] == 'o'
+
+    # Walk inwards and turn right whenever going on would touch the corridor already carved
+    row, col, direction, turns = 0, 0, 0, 0
+    cells[0][0] = ' '
+    while turns < 2:
+        dr, dc = directions[direction]
+        ahead = (row + 2 * dr, col + 2 * dc)
+        if is_wall(row + dr, col + dc) and (is_wall(*ahead) or not inside(*ahead)):
+            row, col = row + dr, col + dc
+            cells[row][col] = ' '
+            turns = 0
+        else:
+            direction = (direction + 1) % 4
+            turns += 1
+    return place_endpoints([''.join(r) for r in cells], (0, 0), (row, col))
+
+
+def place_endpoints(arena, start, goal):
+    for (row, col), mark in ((start, 's'), (goal, 'g')):
+        arena[row] = arena[row][:col] + mark + arena[row][col + 1:]
+    return arena
+
+
+GENERATORS = {
+    'open': open_arena,
+    'maze': perfect_maze,
+    'random': random_arena,
+    'spiral': spiral_arena,
+}
+
+
+# The algorithms of maze.py, plus A* with each of its open lists (astar-heap, astar-heap-g, astar-bucket)
+SEARCHES = dict(maze.ALGORITHMS, **{'astar-' + name: functools.partial(maze.astar_grid, open_list=open_list)
+                                    for name, open_list in maze.OPEN_LISTS.items()})
+
+
+def run(algorithm, grid, memory=True):
+    '''
+    Runs one algorithm on a compiled arena and returns its statistics, the time with memory tracking off
+    and the peak memory (kB) of a second run with it on. The build time is the part of the time spent
+    preprocessing the arena (the abstract graph of HPA*), 0 for the other algorithms.
+    '''
+    search = SEARCHES[algorithm]
+
+    maze.MEMORY_TRACKING = False
+    stats = {}
+    begin_time = time.perf_counter()
+    _, cost, nodes_expanded, max_nodes_stored, max_search_depth, _, _ = search(grid, stats=stats)
+    elapsed = time.perf_counter() - begin_time
+
+    memory_peak = 0
+    if memory:
+        maze.MEMORY_TRACKING = True
+        memory_peak = search(grid)[6]
+
+    return {
+        'cost': cost,
+        'nodes_expanded': nodes_expanded,
+        'max_nodes_stored': max_nodes_stored,
+        'max_search_depth': max_search_depth,
+        'time': elapsed,
+        'build_time': stats.get('graph_time', 0.0),
+        'memory_peak': memory_peak,
+    }
+
+
+def benchmark(generators, sizes, algorithms, seed=0, memory=True):
+    '''
+    Yields one record per (generator, size, algorithm) case, the arenas being generated from the seed
+    '''
+    for generator in generators:
+        for size in sizes:
+            grid = maze.Grid(GENERATORS[generator](size, random.Random(seed)))
+            for algorithm in algorithms:
+                record = {'generator': generator, 'size': size, 'algorithm': algorithm}
+                record.update(run(algorithm, grid, memory))
+                yield record
+
+
+FIELDS = ['generator', 'size', 'algorithm', 'cost', 'nodes_expanded', 'max_nodes_stored', 'max_search_depth',
+          'time', 'build_time', 'memory_peak']
+
+
+def save(records, filename):
+    '''
+    Writes the records to a .csv file, or to a JSON file for any other extension
+    '''
+    with open(filename, 'w', newline='') as f:
+        if filename.endswith('.csv'):
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            json.dump(records, f, indent=1)
+
+
+def load(filename):
+    with open(filename, newline='') as f:
+        if filename.endswith('.csv'):
+            return [{key: value if key in ('generator', 'algorithm') else float(value) for key, value in row.items()}
+                    for row in csv.DictReader(f)]
+        return json.load(f)
+
+
+def compare(records, baseline, tolerance, min_time=0.01):
+    '''
+    Returns a message for every record that regressed against the baseline record of the same case:
+    a different cost or number of nodes expanded, or a time or memory more than tolerance above it.
+    Times under min_time seconds in both runs are too noisy to compare.
+    '''
+    previous = {(r['generator'], int(r['size']), r['algorithm']): r for r in baseline}
+    regressions = []
+    for record in records:
+        old = previous.get((record['generator'], record['size'], record['algorithm']))
+        if old is None:
+            continue
+        case = "%s %d %s" % (record['generator'], record['size'], record['algorithm'])
+        for field in ('cost', 'nodes_expanded'):
+            if record[field] != old[field]:
+                regressions.append("%s: %s changed from %d to %d" % (case, field, old[field], record[field]))
+        for field in ('time', 'memory_peak'):
+            if field == 'time' and max(old[field], record[field]) < min_time:
+                continue
+            if old[field] > 0 and record[field] > old[field] * (1 + tolerance):
+                regressions.append("%s: %s went from %.4g to %.4g" % (case, field, old[field], record[field]))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the maze search algorithms')
+    parser.add_argument('-generators', nargs='+', default=['open', 'maze', 'random', 'spiral'],
+                        choices=sorted(GENERATORS), help="Kinds of arenas to generate")
+    parser.add_argument('-sizes', type=int, nargs='+', default=[10, 100, 1000],
+                        help="Side lengths of the generated arenas (up to 4000)")
+    parser.add_argument('-algorithms', nargs='+', default=['bfs', 'dfs', 'astar', 'jps', 'bibfs', 'biastar'],
+                        choices=sorted(SEARCHES),
+                        help="Algorithms to run, IDA* is left out by default as it is slow on large mazes. "
+                             "astar-heap, astar-heap-g and astar-bucket compare the open lists of A*")
+    parser.add_argument('-seed', type=int, default=0, help="Seed of the arena generators")
+    parser.add_argument('-no-memory', action="store_true", default=False,
+                        help="Skip the memory tracked runs")
+    parser.add_argument('-output', help="Write the results to this .json or .csv file")
+    parser.add_argument('-baseline', help="Compare the results with this earlier .json or .csv output")
+    parser.add_argument('-tolerance', type=float, default=0.25,
+                        help="Relative time and memory increase over the baseline reported as a regression")
+    parser.add_argument('-min-time', type=float, default=0.01,
+                        help="Times (s) below which cases are not compared with the baseline")
+    results = parser.parse_args()
+
+    records = []
+    print("%-8s %6s %-12s %8s %10s %10s %10s %10s" % ("arena", "size", "alg", "cost", "expanded", "time", "build",
+                                                       "memory"))
+    for record in benchmark(results.generators, results.sizes, results.algorithms, results.seed,
+                            not results.no_memory):
+        records.append(record)
+        print("%-8s %6d %-12s %8d %10d %9.3fs %9.3fs %8.0fkB" % (record['generator'], record['size'],
+                                                                 record['algorithm'], record['cost'],
+                                                                 record['nodes_expanded'], record['time'],
+                                                                 record['build_time'], record['memory_peak']),
+              flush=True)
+
+    if results.output:
+        save(records, results.output)
+
+    if results.baseline:
+        regressions = compare(records, load(results.baseline), results.tolerance, results.min_time)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            sys.exit(1)
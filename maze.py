@@ -1,4 +1,3 @@
-import resource
 __author__ = "[Huilin Tai]"
 __email__ = "[ht2666@columbia.edu]"
 
@@ -9,7 +8,13 @@ from queue import LifoQueue
 from queue import Queue  # Stack implementation
 import time
 import heapq
-import time
+import copy
+import functools
+import tracemalloc
+import sys
+import os
+from array import array
+from collections.abc import Sequence
 # =================================#
 # *#*#*# Your code ends here #*#*#*#
 # =================================#
@@ -27,33 +32,275 @@ if __name__ == "__main__":
                         default=False, help="Run A* on the map")
     parser.add_argument('-ida', action="store_true", default=False,
                         help="Run Iterative Deepening A* on the map")
+    parser.add_argument('-jps', action="store_true", default=False,
+                        help="Run Jump Point Search on the map")
+    parser.add_argument('-bibfs', action="store_true", default=False,
+                        help="Run Bidirectional BFS on the map")
+    parser.add_argument('-biastar', action="store_true", default=False,
+                        help="Run Bidirectional A* on the map")
+    parser.add_argument('-wave', action="store_true", default=False,
+                        help="Run the NumPy wavefront BFS on the map")
+    parser.add_argument('-hpa', action="store_true", default=False,
+                        help="Run hierarchical pathfinding (HPA*) on the map")
+    parser.add_argument('-dijkstra', action="store_true", default=False,
+                        help="Run Dijkstra on the map read as weighted terrain (digits 1-9 are cell weights)")
+    parser.add_argument('-terrain-astar', action="store_true", default=False,
+                        help="Run A* on the map read as weighted terrain, with the weighted Manhattan or octile distance")
+    parser.add_argument('-ara', action="store_true", default=False,
+                        help="Run anytime ARA* on the map, within --deadline and --node-budget")
+    parser.add_argument('--weight', type=float, default=3.0,
+                        help="Initial heuristic weight of ARA*, lowered by 0.5 after every path down to 1")
+    parser.add_argument('--deadline', type=float, default=None, metavar='MS',
+                        help="Time budget of ARA* in milliseconds")
+    parser.add_argument('--node-budget', type=int, default=None, metavar='N',
+                        help="Number of nodes ARA* may expand")
+    parser.add_argument('-multibfs', action="store_true", default=False,
+                        help="Run a multi-source BFS from every 's' of the map to the nearest of its 'g'")
+    parser.add_argument('--connectivity', type=int, choices=[4, 8], default=4,
+                        help="Moves of the weighted terrain searches: URDL, or also diagonal")
     parser.add_argument('-all', action="store_true",
                         default=False, help="Run all the 4 algorithms")
-    parser.add_argument('-m', action="store", help="Map filename")
+    parser.add_argument('-m', action="store", nargs='+', help="Map filename(s)")
+    parser.add_argument('--workers', type=int, default=None, metavar='N',
+                        help="Run every (map, algorithm) job on a pool of N processes, one result line per job")
+    parser.add_argument('-batch', action="store", metavar='QUERIES',
+                        help="Answer every 'row col row col' start/goal query of this file against the map")
+    parser.add_argument('-replan', action="store", metavar='UPDATES',
+                        help="Plan with D* Lite, then replan after every block/unblock/start line of this file")
+    parser.add_argument('-waypoints', action="store", metavar='STOPS',
+                        help="Plan a route from the start through every 'row col' waypoint of this file, in order")
+    parser.add_argument('-agents', action="store", metavar='AGENTS',
+                        help="Plan collision free paths for the 'row col row col' start/goal agents of this file, "
+                             "in priority order")
+    parser.add_argument('-prune', action="store_true", default=False,
+                        help="Seal the cells that cannot lie on a path from the start to the goal before searching")
+    parser.add_argument('--landmarks', type=int, default=0, metavar='N',
+                        help="Number of ALT landmarks precomputed for A* in batch mode")
+    parser.add_argument('--convert', action="store", metavar='GRID',
+                        help="Write the map, text or binary, to this binary grid file and exit")
+    parser.add_argument('--cache', action="store", metavar='DIR',
+                        help="Load text maps from binary grids cached in this directory, adding them on a miss")
+    parser.add_argument('--format', choices=['text', 'json', 'jsonl'], default='text',
+                        help="Print the results as text, as one JSON document, or as one JSON line per algorithm")
+    parser.add_argument('--render', action="store_true", default=False,
+                        help="Include the solved arena in the JSON results")
+    parser.add_argument('--window', type=int, nargs=4, metavar=('TOP', 'LEFT', 'HEIGHT', 'WIDTH'),
+                        help="Only render this window of the solved arenas")
+    parser.add_argument('--crop', type=int, default=None, metavar='MARGIN',
+                        help="Only render the part of the solved arenas around their paths, with this margin")
+    parser.add_argument('--overlay', action="store", metavar='FILE',
+                        help="Write the paths of all the algorithms run to this file, on one copy of the arena, "
+                             "instead of printing a solved arena per algorithm")
+    parser.add_argument('--echo', action="store_true", default=False,
+                        help="Print the arena read from the map file before searching it")
+    parser.add_argument('--open-list', choices=['heap', 'heap-g', 'bucket'], default='heap',
+                        help="A* open list: binary heap first in first out (default) or deepest first among "
+                             "equal f, or bucket queue")
+    parser.add_argument('-exact', action="store_true", default=False,
+                        help="Use the exact distance to the goal, cached per arena and goal, as the A* and IDA* heuristic")
+    parser.add_argument('--cluster-size', type=int, default=10, metavar='N',
+                        help="Side of the HPA* clusters in cells")
+    parser.add_argument('--hpa-graph', action="store", metavar='FILE',
+                        help="Load the HPA* abstract graph from this file, or build and save it there if missing")
+    parser.add_argument('--profile', action="store", metavar='FILE',
+                        help="Time the phases of the searches and count their operations, written to this JSON file")
+    parser.add_argument('--cprofile', action="store", metavar='FILE',
+                        help="Run the searches under cProfile and write its stats to this file (pstats format)")
+    parser.add_argument('--no-memory', action="store_true", default=False,
+                        help="Do not measure the memory of each search (RAM usage 0), for timing runs")
+    parser.add_argument('--ida-table', type=int, nargs='?', default=0, const=None, metavar='N',
+                        help="Give IDA* a transposition table of N cells (IDA_TABLE_SIZE without N), 0 for none")
+    parser.add_argument('--ida-cycle-check', action="store_true", default=False,
+                        help="Stop IDA* from revisiting cells that are already on the current path")
 
     results = parser.parse_args()
 
-    if results.m == "" or not (results.all or results.astar or results.bfs or results.dfs or results.ida):
+    if not results.weight >= 1:
+        parser.error("--weight is at least 1, not %g" % results.weight)
+
+    if not results.m or not (results.all or results.astar or results.bfs or results.dfs or results.ida or results.jps
+                                or results.bibfs or results.biastar or results.wave or results.hpa
+                                or results.dijkstra or results.terrain_astar or results.multibfs or results.ara
+                                or results.batch
+                                or results.waypoints or results.agents or results.replan or results.convert):
         print("Check the parameters : >> python hw1_UNI.py -h")
         exit()
 
     if results.all:
         results.bfs = results.dfs = results.astar = results.ida = True
 
-    # Reading of map given and all other initializations
-    try:
-        with open(results.m) as f:
-            arena = f.read()
-            arena = arena.split("\n")
-    except:
-        print("Error in reading the arena file.")
-        exit()
+    if results.workers is None and len(results.m) == 1:
+        results.m = results.m[0]
+
+
+class Grid:
+    '''
+    A compiled, read-only view of an arena, built once and shared by every state and search on it:
+    - Arena (the original list of str, kept for rendering, possibly built lazily)
+    - Dimensions (rows, and cols as the length of the longest row)
+    - Width (cols plus a one cell wall border on each side)
+    - Passable (flat bytearray over the bordered arena, 1 for a passable cell, 0 for a wall)
+    - Start and Goal (flat cell indices, -1 if missing)
+    - Offsets (flat index deltas of the neighbors, in URDL order)
+    Cells past the end of a short row are walls, the same as MazeState.is_passable.
+    '''
+
+    ACTIONS = ('UP', 'RIGHT', 'DOWN', 'LEFT')
+
+    # Terrain weights of a grid rebuilt from a mask, see Terrain.grid_weights. Grids of a text arena keep
+    # None and have their weights read from the digits of the arena.
+    weights = None
+    rebuilt = False
+
+    # Every byte is passable except 'o'
+    _PASSABLE = bytes(0 if b == ord('o') else 1 for b in range(256))
+    # Inverse of _PASSABLE for arenas rebuilt from a mask
+    _TEXT = bytes.maketrans(b'\x00\x01', b'o ')
+
+    def __init__(self, arena):
+        self.arena = arena
+        self.set_size(len(arena), max((len(row) for row in arena), default=0))
+
+        self.passable = bytearray(self.size)
+        self.start = self.goal = -1
+        for i, row in enumerate(arena):
+            base = (i + 1) * self.width + 1
+            self.passable[base:base + len(row)] = row.encode('latin-1', 'replace').translate(self._PASSABLE)
+            if self.start == -1 and 's' in row:
+                self.start = base + row.index('s')
+            if self.goal == -1 and 'g' in row:
+                self.goal = base + row.index('g')
+
+    @classmethod
+    def from_mask(cls, passable, rows, cols, start, goal, arena=None, weights=None):
+        '''
+        Returns a grid over an already compiled passability mask, which can be any bytes-like object with
+        find and rfind (such as an mmap), without parsing anything. Without an arena, one is rebuilt from
+        the mask by mask_arena when it is first needed. Such an arena has lost the digits of weighted
+        terrain, so the weighted searches need the weights plane of the grid (see Terrain).
+        '''
+        grid = cls.__new__(cls)
+        grid.set_size(rows, cols)
+        grid.passable = passable
+        grid.start, grid.goal = start, goal
+
+        grid.arena = grid.mask_arena if arena is None else arena
+        grid.rebuilt = arena is None
+        grid.weights = weights
+        return grid
+
+    @property
+    def arena(self):
+        '''
+        The arena as a list of str. A grid can be given a function instead, which is only called the
+        first time the arena is needed (to render a path), so that large maps are never split into rows
+        when nothing is printed. The function takes the optional (top, bottom, left, right) of a window
+        and returns only its rows, cut to its columns, for arena_window.
+        '''
+        if callable(self._arena):
+            self._arena = self._arena()
+        return self._arena
+
+    @arena.setter
+    def arena(self, arena):
+        self._arena = arena
+
+    def arena_window(self, top=0, bottom=None, left=0, right=None):
+        '''
+        Returns the rows top to bottom - 1 of the arena cut to the columns left to right - 1 (None for the
+        end). While the arena is still a function, only the window is decoded, the rest of a large map is not.
+        '''
+        if callable(self._arena):
+            return self._arena(top, bottom, left, right)
+        return [row[left:right] for row in self._arena[top:bottom]]
+
+    def mask_arena(self, top=0, bottom=None, left=0, right=None):
+        '''
+        Returns an arena rebuilt from the mask, with ' ' for passable cells, 'o' for walls, 's' and 'g',
+        or only the rows top to bottom - 1 of it, cut to the columns left to right - 1
+        '''
+        bottom = self.rows if bottom is None else max(top, min(bottom, self.rows))
+        left = min(left, self.cols)
+        right = self.cols if right is None else max(left, min(right, self.cols))
+        arena = [self.passable[self.index(row, left):self.index(row, right)].translate(self._TEXT).decode('latin-1')
+                 for row in range(top, bottom)]
+        for cell, mark in ((self.start, 's'), (self.goal, 'g')):
+            if cell != -1:
+                row, col = self.position(cell)
+                row, col = row - top, col - left
+                if 0 <= row < len(arena) and 0 <= col < len(arena[row]):
+                    arena[row] = arena[row][:col] + mark + arena[row][col + 1:]
+        return arena
+
+    def set_size(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.size = self.width * (rows + 2)
+        self.offsets = (-self.width, 1, self.width, -1)
+
+    def index(self, row, col):
+        '''
+        Returns the flat cell index of (row, col)
+        '''
+        return (row + 1) * self.width + col + 1
+
+    def position(self, cell):
+        '''
+        Returns the (row, col) of a flat cell index, (-1, -1) for a missing cell
+        '''
+        if cell < 0:
+            return (-1, -1)
+        row, col = divmod(cell, self.width)
+        return (row - 1, col - 1)
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
 
-    # Internal representation
-    print(arena)
+    def neighbors(self, cell):
+        '''
+        Returns the passable neighbors of a cell in URDL order
+        '''
+        passable = self.passable
+        return [cell + offset for offset in self.offsets if passable[cell + offset]]
+
+    def with_endpoints(self, start, goal):
+        '''
+        Returns a copy of the grid sharing its arena and passability mask, with the start and goal
+        moved to the given (row, col) positions instead of the 's' and 'g' of the arena
+        '''
+        for row, col in (start, goal):
+            if not self.in_bounds(row, col):
+                raise ValueError("(%d, %d) is outside the %dx%d arena" % (row, col, self.rows, self.cols))
+        grid = copy.copy(self)
+        grid.start = self.index(*start)
+        grid.goal = self.index(*goal)
+        return grid
+
+    def marks(self, mark):
+        '''
+        Returns the cell indices of every occurrence of a mark (such as 's' or 'g') in the arena, row by row
+        '''
+        cells = []
+        for i, row in enumerate(self.arena):
+            col = row.find(mark)
+            while col != -1:
+                cells.append(self.index(i, col))
+                col = row.find(mark, col + 1)
+        return cells
 
-    print("The arena of size " + str(len(arena)) + "x" + str(len(arena[0])))
-    print("\n".join(arena))
+    def digest(self):
+        '''
+        Returns the SHA-256 hex digest of the dimensions and passability mask (not of the start and goal),
+        computed once per grid and shared with its with_endpoints copies made afterwards
+        '''
+        if getattr(self, '_digest', None) is None:
+            import hashlib
+
+            digest = hashlib.sha256(b'%d %d ' % (self.rows, self.cols))
+            digest.update(self.passable)
+            self._digest = digest.hexdigest()
+        return self._digest
 
 
 class MazeState:
@@ -65,17 +312,18 @@ class MazeState:
     - Action (the action taken in the parent state, direction moved, which lead to the creation of the current state)
     - Cost (Cost  of the path taken from the start to the current state)
     - Children (a child of the current state is generated by moving in a direction)
+    - Grid (the compiled arena shared with the parent, see Grid)
+    The searches themselves keep their tree in a SearchNodes, MazeState is kept for callers that want state objects.
     '''
 
+    __slots__ = ('arena', 'parent', 'action', 'cost', 'children', 'grid', 'start', 'goal', 'current_position')
+
     def get_start_index(self):
         '''
         Returns the start index of the maze based on the given arena
         returns (-1, -1) if no start index found
         '''
-        for i, row in enumerate(self.arena):
-            if 's' in row:
-                return (i, row.index('s'))
-        return (-1, -1)
+        return self.grid.position(self.grid.start)
         # =======================================================================#
         # *#*#*# TODO: Write your code to find the start index of the maze #*#*#*#
         # =======================================================================#
@@ -90,10 +338,7 @@ class MazeState:
         Returns the goal index of the maze based on the given arena
         returns (-1, -1) if no goal index found
         '''
-        for i, row in enumerate(self.arena):
-            if 'g' in row:
-                return (i, row.index('g'))
-        return (-1, -1)
+        return self.grid.position(self.grid.goal)
         # ======================================================================#
         # *#*#*# TODO: Write your code to find the goal index of the maze #*#*#*#
         # ======================================================================#
@@ -103,7 +348,7 @@ class MazeState:
         # *#*#*# Your code ends here #*#*#*#
         # =================================#
 
-    def __init__(self, arena, parent=None, action='Start', cost=0, current_position=(-1, -1)):
+    def __init__(self, arena, parent=None, action='Start', cost=0, current_position=(-1, -1), grid=None):
 
         self.arena = arena
         self.parent = parent
@@ -111,6 +356,11 @@ class MazeState:
         self.cost = cost
         self.children = []
 
+        # The arena is only compiled for a root state, children share it
+        if grid is None:
+            grid = parent.grid if parent is not None else Grid(arena)
+        self.grid = grid
+
         self.start = self.get_start_index()
         self.goal = self.get_goal_index()
 
@@ -122,46 +372,34 @@ class MazeState:
     def display(self):
         print("\n".join(self.arena))
 
-    def move_up(self):
-        new_row = self.current_position[0] - 1
-        new_col = self.current_position[1]
-        if new_row >= 0 and self.is_passable(new_row, new_col):
-            return MazeState(self.arena, self, action='UP', cost=self.cost + 1,
-                             current_position=(new_row, new_col))
+    def move(self, direction):
+        '''
+        Returns the child reached by moving in the given direction (an index into Grid.ACTIONS),
+        or None if that cell is a wall or outside the arena.
+        '''
+        grid = self.grid
+        cell = grid.index(*self.current_position) + grid.offsets[direction]
+        if grid.passable[cell]:
+            return MazeState(self.arena, self, action=grid.ACTIONS[direction], cost=self.cost + 1,
+                             current_position=grid.position(cell), grid=grid)
         else:
             return None
 
+    def move_up(self):
+        return self.move(0)
+
     def move_down(self):
-        new_row = self.current_position[0] + 1
-        new_col = self.current_position[1]
-        if new_row < len(self.arena) and self.is_passable(new_row, new_col):
-            return MazeState(self.arena,  self, action='DOWN', cost=self.cost + 1,
-                             current_position=(new_row,  new_col))
-        else:
-            return None
+        return self.move(2)
 
     def move_left(self):
-        new_row = self.current_position[0]
-
-        new_col = self.current_position[1] - 1
-        if new_col >= 0 and self.is_passable(new_row, new_col):
-            return MazeState(self.arena,  self, action='LEFT', cost=self.cost + 1,
-                             current_position=(new_row, new_col))
-        else:
-            return None
+        return self.move(3)
 
     def move_right(self):
-        new_row = self.current_position[0]
-        new_col = self.current_position[1] + 1
-        if new_col < len(self.arena[new_row]) and self.is_passable(new_row, new_col):
-            return MazeState(self.arena, self,  action='RIGHT', cost=self.cost + 1,
-                             current_position=(new_row,  new_col))
-        else:
-            return None
+        return self.move(1)
 
     def is_passable(self,  row, col):
-        if col < len(self.arena[row]):
-            return self.arena[row][col] != 'o'
+        if self.grid.in_bounds(row, col):
+            return self.grid.passable[self.grid.index(row, col)] == 1
         else:
             return False
 
@@ -235,10 +473,243 @@ class MazeState:
 # ================================================================================#
 # *#*#*# Optional: You may write helper functions in this space if required #*#*#*#
 # ================================================================================#
-def mark_solution_path(state):
+class SolvedArena(Sequence):
+    '''
+    The solved arena of a search, a sequence of str like the arena, which only keeps:
+    - Grid (the arena the search ran on)
+    - Path (the cell indices of the solution, from the start to the goal)
+    The rows, with the path marked, are rendered the first time they are read, so a caller that only
+    wants the path (see positions and moves) never pays for the area of the arena, and window and crop
+    render only a part of it. It compares equal to the list of str it renders to. Searches without a
+    solution return one with an empty path, which has no rows (it is [] like the arena of a failure was).
+    '''
+
+    def __init__(self, grid, path):
+        self.grid = grid
+        self.path = path
+        self._rows = None
+
+    def rows(self):
+        if self._rows is None:
+            lap = PROFILER.lap('render') if PROFILER is not None else None
+            self._rows = self.window(0, 0, self.grid.rows, self.grid.cols)
+            if lap:
+                lap('rows', cells=len(self.path))
+        return self._rows
+
+    def window(self, top, left, height, width):
+        '''
+        Returns the rows top to top + height - 1, cut to the columns left to left + width - 1, with the path
+        marked (see draw_cells): '*' on its cells except on 's' and 'g', and 's' on its first cell
+        '''
+        if not self.path:
+            return []
+        lines = draw_cells(self.grid, self.path[1:], b'*', top, left, height, width)
+
+        # Mark the start position with 's'
+        start_row, start_col = self.grid.position(self.path[0])
+        start_row, start_col = start_row - top, start_col - left
+        if 0 <= start_row < len(lines) and 0 <= start_col < len(lines[start_row]):
+            line = lines[start_row]
+            lines[start_row] = line[:start_col] + 's' + line[start_col + 1:]
+        return lines
+
+    def bounds(self):
+        '''
+        Returns the (top, left, bottom, right) of the bounding box of the path, inclusive, None without a path
+        '''
+        if not self.path:
+            return None
+        try:
+            import numpy as np
+        except ImportError:
+            positions = self.positions()
+            rows = [row for row, _ in positions]
+            cols = [col for _, col in positions]
+            return min(rows), min(cols), max(rows), max(cols)
+        rows, cols = np.divmod(np.array(self.path), self.grid.width)
+        return int(rows.min()) - 1, int(cols.min()) - 1, int(rows.max()) - 1, int(cols.max()) - 1
+
+    def crop(self, margin=2):
+        '''
+        Returns the window around the bounding box of the path, with margin cells on every side
+        '''
+        if not self.path:
+            return []
+        top, left, bottom, right = self.bounds()
+        top, left = max(0, top - margin), max(0, left - margin)
+        return self.window(top, left, bottom + margin + 1 - top, right + margin + 1 - left)
+
+    def __getitem__(self, index):
+        return self.rows()[index]
+
+    def __len__(self):
+        return self.grid.rows if self.path else 0
+
+    def __eq__(self, other):
+        if isinstance(other, (list, SolvedArena)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.rows())
+
+    def positions(self):
+        '''
+        Returns the (row, col) of every cell of the path
+        '''
+        return [self.grid.position(cell) for cell in self.path]
+
+    def moves(self):
+        '''
+        Returns the moves of the path as a run-length string of U, R, D and L, each preceded by its count
+        when it repeats: "3R2DL" is RIGHT three times, DOWN twice, then LEFT. Diagonal moves (see Terrain)
+        are two lowercase letters, "2urD" is UP-RIGHT twice then DOWN. None without a path.
+        '''
+        import itertools
+
+        if not self.path:
+            return None
+
+        letters = {offset: action[0] for offset, action in zip(self.grid.offsets, self.grid.ACTIONS)}
+        up, right, down, left = self.grid.offsets
+        for first, second in ((up, right), (down, right), (down, left), (up, left)):
+            letters[first + second] = (letters[first] + letters[second]).lower()
+        steps = (letters[cell - previous] for previous, cell in zip(self.path, self.path[1:]))
+        return ''.join((str(count) if count > 1 else '') + letter
+                       for letter, count in ((letter, len(list(run))) for letter, run in itertools.groupby(steps)))
+
+
+def draw_cells(grid, cells, marks, top=0, left=0, height=None, width=None):
+    '''
+    Returns the rows top to top + height - 1 of the arena (to the last row if None), cut to the columns
+    left to left + width - 1 (to the end of each row if None), with every cell of cells (flat indices)
+    inside the window drawn with its mark (one byte for all of them, or one byte per cell) unless it is
+    an 's' or a 'g'. The rows of the window are joined into one bytearray, and the buffer offsets of the
+    cells are computed from the array of their indices and drawn in one pass, with NumPy if it is
+    installed. Only the window of the arena is decoded (see Grid.arena_window). Arenas that are not
+    latin-1 are drawn one cell at a time on lists of characters.
+    '''
+    if top < 0 or left < 0:
+        raise ValueError("The window (%d, %d) starts outside the arena" % (top, left))
+    bottom = grid.rows if height is None else max(top, min(grid.rows, top + height))
+    right = None if width is None else left + width
+    lines = grid.arena_window(top, bottom, left, right)
+    if not lines:
+        return []
+    if len(marks) == 1:
+        marks = marks * len(cells)
+
+    try:
+        buffer = bytearray("\n".join(lines).encode('latin-1'))
+    except UnicodeEncodeError:
+        lines = [list(line) for line in lines]
+        for cell, mark in zip(cells, marks):
+            row, col = grid.position(cell)
+            row, col = row - top, col - left
+            if 0 <= row < len(lines) and 0 <= col < len(lines[row]) and lines[row][col] not in ('s', 'g'):
+                lines[row][col] = chr(mark)
+        return ["".join(line) for line in lines]
+
+    # Offset of the first byte of every line of the buffer, and the length of every line
+    starts = array('l', [0]) * len(lines)
+    lengths = array('l', map(len, lines))
+    for i in range(1, len(lines)):
+        starts[i] = starts[i - 1] + lengths[i - 1] + 1
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None and len(cells):
+        marks = np.frombuffer(bytes(marks), dtype=np.uint8)
+        rows, cols = np.divmod(np.asarray(cells, dtype=np.int64), grid.width)
+        rows -= top + 1
+        cols -= left + 1
+        inside = (rows >= 0) & (rows < len(lines)) & (cols >= 0)
+        rows, cols, marks = rows[inside], cols[inside], marks[inside]
+        inside = cols < np.frombuffer(lengths, dtype=lengths.typecode)[rows]
+        offsets = np.frombuffer(starts, dtype=starts.typecode)[rows[inside]] + cols[inside]
+        marks = marks[inside]
+        view = np.frombuffer(buffer, dtype=np.uint8)
+        current = view[offsets]
+        drawn = (current != ord('s')) & (current != ord('g'))
+        view[offsets[drawn]] = marks[drawn]
+    else:
+        for cell, mark in zip(cells, marks):
+            row, col = divmod(cell, grid.width)
+            row, col = row - top - 1, col - left - 1
+            if 0 <= row < len(lines) and 0 <= col < lengths[row]:
+                offset = starts[row] + col
+                if buffer[offset] not in b'sg':
+                    buffer[offset] = mark
+    return buffer.decode('latin-1').split("\n")
+
+
+# Marks of the paths of an overlay, in order, the cells shared by several paths being marked '*'
+OVERLAY_MARKS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def overlay(grid, paths, top=0, left=0, height=None, width=None):
+    '''
+    Returns a window of the arena (see draw_cells) with several paths, lists of cell indices, drawn at once:
+    the cells of only one path are marked with its letter of OVERLAY_MARKS, and the cells of several with '*'
+    '''
+    if len(paths) > len(OVERLAY_MARKS):
+        raise ValueError("An overlay holds at most %d paths" % len(OVERLAY_MARKS))
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is not None:
+        owner = np.zeros(grid.size, dtype=np.uint8)
+        for mark, path in zip(OVERLAY_MARKS.encode(), paths):
+            if len(path):
+                path = np.asarray(path, dtype=np.int64)
+                current = owner[path]
+                owner[path] = np.where((current == 0) | (current == mark), mark, ord('*'))
+        cells = np.flatnonzero(owner)
+        marks = owner[cells].tobytes()
+    else:
+        owner = {}
+        for mark, path in zip(OVERLAY_MARKS.encode(), paths):
+            for cell in path:
+                owner[cell] = mark if owner.get(cell, mark) == mark else ord('*')
+        cells = list(owner)
+        marks = bytes(owner.values())
+    return draw_cells(grid, cells, marks, top, left, height, width)
+
+
+def write_overlay(grid, results, filename, top=0, left=0, height=None, width=None):
+    '''
+    Writes the paths of several searches, (name, cost, solved arena) triples, to one text file: a "# mark name
+    cost" legend line per search, then the overlay of their paths. Searches without a solution have no path.
+    '''
+    paths = [solved_arena.path for _, _, solved_arena in results]
+    with open(filename, 'w') as f:
+        for mark, (name, cost, _) in zip(OVERLAY_MARKS, results):
+            f.write("# %s %s %s\n" % (mark, name, cost))
+        f.write("\n".join(overlay(grid, paths, top, left, height, width)) + "\n")
+
+
+def render_path(grid, path):
+    """
+    Mark a path, given as a list of cell indices from the start to the goal, with stars ('*').
+    The arena is returned as a SolvedArena, rendered when it is first read.
+    """
+    return SolvedArena(grid, path)
+
+
+def mark_solution_path(state, nodes=None):
     """
     Backtrack from the goal to the start and mark the solution path with stars ('*').
+    The state is either a MazeState, or the goal cell index of a search whose tree is
+    stored in nodes (a SearchNodes), in which case the path is rebuilt from its parent buffer.
     """
+    if nodes is not None:
+        return render_path(nodes.grid, nodes.path(state))
+
     arena_with_wholepath = [list(row) for row in state.arena]
 
     # Backtrack from the goal to the start
@@ -257,6 +728,384 @@ def mark_solution_path(state):
     return ["".join(row) for row in arena_with_wholepath]
 
 
+class SearchNodes:
+    '''
+    Compact storage of a search tree over a Grid, with one slot per cell instead of one MazeState per node:
+    - Parent (array of the parent cell index, -1 for the start and for unreached cells)
+    - Cost (array of the cost of the path from the start, -1 for unreached cells)
+    - Action (bytearray of the index into Grid.ACTIONS of the move that reached the cell)
+    '''
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.parent = array('i', [-1]) * grid.size
+        self.cost = array('i', [-1]) * grid.size
+        self.action = bytearray(grid.size)
+
+    def path(self, cell):
+        '''
+        Returns the cells from the start to the given cell
+        '''
+        parent = self.parent
+        path = [cell]
+        while parent[cell] != -1:
+            cell = parent[cell]
+            path.append(cell)
+        path.reverse()
+        return path
+
+    def state(self, cell):
+        '''
+        Returns a MazeState for the given cell, with its parent chain rebuilt from the buffers
+        '''
+        grid = self.grid
+        state = None
+        for step in self.path(cell):
+            if state is None:
+                state = MazeState(grid.arena, current_position=grid.position(step), grid=grid)
+            else:
+                state = MazeState(grid.arena, state, action=grid.ACTIONS[self.action[step]], cost=self.cost[step],
+                                  current_position=grid.position(step), grid=grid)
+        return state
+
+
+def manhattan(grid, target):
+    '''
+    Returns the Manhattan distance heuristic from any cell of the grid to the target cell
+    '''
+    width = grid.width
+    target_row, target_col = divmod(target, width)
+
+    def heuristic(cell):
+        row, col = divmod(cell, width)
+        return abs(target_row - row) + abs(target_col - col)
+    return heuristic
+
+
+def distance_field(grid, source):
+    '''
+    Returns the BFS distance from the source cell to every cell of the grid, -1 for the unreachable ones
+    '''
+    from collections import deque
+
+    distance = array('i', [-1]) * grid.size
+    if source == -1 or not grid.passable[source]:
+        return distance
+    passable = grid.passable
+    offsets = grid.offsets
+    distance[source] = 0
+    frontier = deque([source])
+    while frontier:
+        cell = frontier.popleft()
+        neighbor_distance = distance[cell] + 1
+        for offset in offsets:
+            neighbor = cell + offset
+            if passable[neighbor] and distance[neighbor] == -1:
+                distance[neighbor] = neighbor_distance
+                frontier.append(neighbor)
+    return distance
+
+
+def component_labels(grid):
+    '''
+    Returns the connected component label of every cell of the grid, labels start at 1 and walls are 0
+    '''
+    passable = grid.passable
+    offsets = grid.offsets
+    labels = array('i', bytes(4 * grid.size))
+    label = 0
+    cell = passable.find(b'\x01')
+    while cell != -1:
+        if labels[cell] == 0:
+            label += 1
+            labels[cell] = label
+            stack = [cell]
+            while stack:
+                current = stack.pop()
+                for offset in offsets:
+                    neighbor = current + offset
+                    if passable[neighbor] and labels[neighbor] == 0:
+                        labels[neighbor] = label
+                        stack.append(neighbor)
+        cell = passable.find(b'\x01', cell + 1)
+    return labels
+
+
+def prune_grid(grid, labels=None, stats=None):
+    '''
+    Returns a copy of the grid, sharing its arena, whose mask only keeps the cells that can lie on a simple
+    path from the start to the goal, every other cell being sealed as a wall, so that any search on it
+    explores no more than on the grid and shortest paths are unchanged:
+    - Components (with the connected component labels of the grid (see component_labels), which its
+      with_endpoints copies share, a goal in another component than the start is rejected at once. Without
+      them it is rejected when the DFS below does not reach it. Only the start is then kept, so that every
+      search fails after one expansion)
+    - Dead ends and pockets (one iterative DFS from the start computes the low links of its cells: the subtree
+      of a cell whose low link does not reach above its parent hangs off that parent alone, and holds no
+      simple path to the goal unless it holds the goal, so it is sealed whole)
+    The counts of open and pruned cells, the percentage of the open area pruned and whether the goal is
+    reachable are stored in stats as 'open_cells', 'pruned_cells', 'pruned_percent' and 'reachable'.
+    '''
+    passable = grid.passable
+    offsets = grid.offsets
+    start, goal = grid.start, grid.goal
+    kept = bytearray(grid.size)
+
+    if start == -1 or not passable[start]:
+        pass
+    elif goal == -1 or not passable[goal] or (labels is not None and labels[start] != labels[goal]):
+        kept[start] = 1
+    else:
+        discovery = array('i', [-1]) * grid.size
+        low = array('i', [-1]) * grid.size
+        parent = array('i', [-1]) * grid.size
+        direction = bytearray(grid.size)
+        cells = [start]
+        discovery[start] = low[start] = 0
+        holds_goal = bytearray(grid.size)
+        holds_goal[goal] = 1
+        sealed = []
+        stack = [start]
+        while stack:
+            cell = stack[-1]
+            d = direction[cell]
+            if d < 4:
+                direction[cell] = d + 1
+                neighbor = cell + offsets[d]
+                if not passable[neighbor]:
+                    continue
+                if discovery[neighbor] == -1:
+                    discovery[neighbor] = low[neighbor] = len(cells)
+                    cells.append(neighbor)
+                    parent[neighbor] = cell
+                    stack.append(neighbor)
+                elif neighbor != parent[cell] and discovery[neighbor] < low[cell]:
+                    low[cell] = discovery[neighbor]
+                continue
+
+            # The cells discovered since this one are its subtree
+            stack.pop()
+            if stack:
+                above = stack[-1]
+                if low[cell] < low[above]:
+                    low[above] = low[cell]
+                if holds_goal[cell]:
+                    holds_goal[above] = 1
+                elif low[cell] >= discovery[above]:
+                    sealed.append((discovery[cell], len(cells)))
+
+        if discovery[goal] == -1:
+            sealed = [(1, len(cells))]
+
+        # Sealed subtrees are ranges of the discovery order, possibly nested
+        depth = array('i', bytes(4 * (len(cells) + 1)))
+        for begin, end in sealed:
+            depth[begin] += 1
+            depth[end] -= 1
+        covered = 0
+        for order, cell in enumerate(cells):
+            covered += depth[order]
+            if not covered:
+                kept[cell] = 1
+
+    if stats is not None:
+        open_cells = bytes(passable).count(1)
+        stats['open_cells'] = open_cells
+        stats['pruned_cells'] = open_cells - kept.count(1)
+        stats['pruned_percent'] = 100.0 * stats['pruned_cells'] / open_cells if open_cells else 0.0
+        stats['reachable'] = int(goal != -1 and bool(kept[goal]))
+
+    pruned = copy.copy(grid)
+    pruned.passable = kept
+    pruned._digest = None
+    return pruned
+
+
+class DistanceCache:
+    '''
+    A least recently used cache of goal rooted distance fields (see distance_field), keyed by (arena digest, goal cell):
+    - Capacity (the number of fields kept, the least recently used one is dropped past it)
+    - Hits and Misses (the lookups answered from the cache, and the fields computed)
+    Moves cost the same both ways, so the field from the goal is also the exact distance to it.
+    '''
+
+    def __init__(self, capacity=16):
+        from collections import OrderedDict
+
+        self.capacity = capacity
+        self.fields = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def field(self, grid, goal):
+        key = (grid.digest(), goal)
+        field = self.fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(key)
+            return field
+
+        self.misses += 1
+        field = self.fields[key] = distance_field(grid, goal)
+        if len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        return field
+
+    def memory(self):
+        '''
+        Returns the memory held by the cached fields in kB
+        '''
+        return sum(field.itemsize * len(field) for field in self.fields.values()) / 1024
+
+    def report(self):
+        return "%d hits, %d misses, %d fields, %.1fkB" % (self.hits, self.misses, len(self.fields), self.memory())
+
+
+# Shared by every exact heuristic unless another cache is given
+HEURISTIC_CACHE = DistanceCache()
+
+
+def exact_heuristic(grid, goal, cache=None):
+    '''
+    Returns the exact distance heuristic to the goal cell, read from its cached distance field. It is
+    admissible and consistent, and only cells on shortest paths have an f equal to the optimal cost.
+    Cells that cannot reach the goal are at -1, and are never reached from a start that can.
+    '''
+    if cache is None:
+        cache = HEURISTIC_CACHE
+    return cache.field(grid, goal).__getitem__
+
+
+# Set to a Profiler to time the phases of the searches, while None a search only tests it once per phase
+PROFILER = None
+
+
+class Profiler:
+    '''
+    Opt-in instrumentation of the searches, collected while it is the module's PROFILER:
+    - Phases (nanoseconds spent in each phase of each algorithm, timed with perf_counter_ns)
+    - Counters (operations of each algorithm: expansions, frontier pushes and pops...)
+    - Calls (the number of runs of each algorithm)
+    The searches only mark the ends of their phases and add up counts they keep anyway, nothing runs per node.
+    '''
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.calls = {}
+
+    def lap(self, algorithm):
+        '''
+        Starts a run of the algorithm and returns a function ending its current phase: lap(phase, **counts)
+        adds the time since the previous lap (or the start) to the phase, and the counts to the counters
+        '''
+        self.calls[algorithm] = self.calls.get(algorithm, 0) + 1
+        phases = self.phases.setdefault(algorithm, {})
+        counters = self.counters.setdefault(algorithm, {})
+        last = [time.perf_counter_ns()]
+
+        def lap(phase, **counts):
+            now = time.perf_counter_ns()
+            phases[phase] = phases.get(phase, 0) + now - last[0]
+            last[0] = now
+            for name, count in counts.items():
+                counters[name] = counters.get(name, 0) + count
+        return lap
+
+    def report(self):
+        '''
+        Returns one line per algorithm with its calls, the milliseconds of each phase and its counters
+        '''
+        lines = []
+        for algorithm, calls in self.calls.items():
+            phases = ", ".join("%s %.3fms" % (phase, ns / 1e6) for phase, ns in self.phases[algorithm].items())
+            counters = ", ".join("%s %d" % item for item in self.counters[algorithm].items())
+            lines.append("%s: %d calls; %s; %s" % (algorithm, calls, phases, counters))
+        return lines
+
+    def dump(self, filename):
+        '''
+        Writes the phases (in ns), counters and calls to a JSON file
+        '''
+        import json
+
+        with open(filename, 'w') as f:
+            json.dump({'phases_ns': self.phases, 'counters': self.counters, 'calls': self.calls}, f, indent=1)
+
+
+# Set to False for timing runs, the searches then report a RAM usage of 0 and run without tracemalloc
+MEMORY_TRACKING = True
+
+
+# Number of measure_memory searches running, nested ones are not measured on their own
+_measure_depth = 0
+
+
+def measure_memory(search):
+    '''
+    Decorates a grid search so that the RAM usage of its result is the peak memory in kB allocated by
+    that search alone, measured with tracemalloc from its start, instead of the peak of the whole process.
+    If the search is called with a stats dict, the peak and the net allocation still held when it
+    returns (its result included) are stored in it as 'memory_peak' and 'memory_net', in kB.
+    tracemalloc slows the search down, so the times of timing runs should be taken with MEMORY_TRACKING off.
+    Searches may nest (D* Lite runs A*, multi-agent planning one search per agent): only the outermost one
+    is measured, the peak of a nested one being part of it, and the nested ones run as if MEMORY_TRACKING was off.
+    '''
+    @functools.wraps(search)
+    def measured(grid, *args, **kwargs):
+        global _measure_depth
+        if not MEMORY_TRACKING or _measure_depth:
+            return search(grid, *args, **kwargs)
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        _measure_depth += 1
+        try:
+            result = search(grid, *args, **kwargs)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            _measure_depth -= 1
+            if started:
+                tracemalloc.stop()
+
+        stats = kwargs.get('stats')
+        if stats is not None:
+            stats['memory_peak'] = (peak - before) / 1024
+            stats['memory_net'] = (current - before) / 1024
+        return result[:6] + ((peak - before) / 1024,)
+    return measured
+
+
+def measured_search(search, grid, stats=None, **options):
+    '''
+    Runs a measure_memory search for its result and time with MEMORY_TRACKING off, then, unless it is off
+    already, a second time with it on for its RAM usage and the memory stats, so that the time reported is
+    not the one of a search slowed down by tracemalloc. The second run is not profiled.
+    '''
+    global MEMORY_TRACKING, PROFILER
+    tracking = MEMORY_TRACKING
+    MEMORY_TRACKING = False
+    try:
+        result = search(grid, stats=stats, **options)
+    finally:
+        MEMORY_TRACKING = tracking
+    if not tracking:
+        return result
+
+    memory_stats = {}
+    profiler, PROFILER = PROFILER, None
+    try:
+        ram = search(grid, stats=memory_stats, **options)[6]
+    finally:
+        PROFILER = profiler
+    if stats is not None:
+        stats.update((key, value) for key, value in memory_stats.items() if key.startswith('memory_'))
+    return result[:6] + (ram,)
+
+
 # =================================#
 # *#*#*# Your code ends here #*#*#*#
 # =================================#
@@ -264,370 +1113,3059 @@ def mark_solution_path(state):
 '''
 This function runs Breadth First Search on the input arena (which is a list of str)
 Returns a ([], int) tuple where the [] represents the solved arena as a list of str and the int represents the cost of the solution
+The arena is compiled once into a Grid and the search itself runs in bfs_grid
 '''
 
 
 def bfs(arena):
+    return bfs_grid(Grid(arena))
+
+
+@measure_memory
+def bfs_grid(grid, stats=None):
     from collections import deque
     import time
 
     begin_time = time.time()
-
-    start_state = MazeState(arena)
-
-    frontier = deque([start_state])
-    explored = set()
+    lap = PROFILER.lap('bfs') if PROFILER is not None else None
 
     max_nodes_stored = 1
     max_search_depth = 0
     nodes_expanded = 0
 
-    if start_state.start == (-1, -1) or start_state.goal == (-1, -1):
-        return [], -1, 0, 0, 0, time.time() - begin_time, 0  # No solution
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0  # No solution
+
+    nodes = SearchNodes(grid)
+    parent, cost, action = nodes.parent, nodes.cost, nodes.action
+    passable = grid.passable
+    offsets = tuple(enumerate(grid.offsets))
+
+    # A cell is discovered once it has a cost, the frontier and the explored cells together are exactly the discovered ones
+    cost[start] = 0
+    discovered = 1
+    frontier = deque([start])
+    if lap:
+        lap('setup')
 
     while len(frontier) > 0:
-        state = frontier.popleft()
-        explored.add(state)
+        cell = frontier.popleft()
 
         # Check if  reached the goal
-        if state.current_position == state.goal:
-            solution_path = mark_solution_path(state)  # Path found, mark it
-            ram_usage = resource.getrusage(
-                resource.RUSAGE_SELF).ru_maxrss / 1024
-            return solution_path, state.cost, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, ram_usage
+        if cell == goal:
+            if lap:
+                lap('search', expanded=nodes_expanded, pushes=discovered, pops=nodes_expanded + 1)
+            solution_path = mark_solution_path(cell, nodes)  # Path found, mark it
+            if lap:
+                lap('path')
+            return solution_path, cost[cell], nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
 
         nodes_expanded += 1
-
-        for neighbor in state.expand():  # Expand
-
-            if neighbor not in explored and neighbor not in frontier:
+        neighbor_cost = cost[cell] + 1
+
+        for direction, offset in offsets:  # Expand in URDL order
+            neighbor = cell + offset
+            if passable[neighbor] and cost[neighbor] == -1:
+                cost[neighbor] = neighbor_cost
+                parent[neighbor] = cell
+                action[neighbor] = direction
                 frontier.append(neighbor)
+                discovered += 1
                 # Update max search depth
-                max_search_depth = max(max_search_depth, neighbor.cost)
+                if neighbor_cost > max_search_depth:
+                    max_search_depth = neighbor_cost
 
         # Update
-        max_nodes_stored = max(max_nodes_stored, len(frontier) + len(explored))
+        if discovered > max_nodes_stored:
+            max_nodes_stored = discovered
 
     # If no solution found
-    return [], -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+    if lap:
+        lap('search', expanded=nodes_expanded, pushes=discovered, pops=nodes_expanded)
+    return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
 
 
 '''
 This function runs Depth First Search on the input arena (which is a list of str)
 Returns a ([], int) tuple where the [] represents the solved arena as a list of str and the int represents the cost of the solution
+The arena is compiled once into a Grid and the search itself runs in dfs_grid
 '''
 
 
 def dfs(arena):
+    return dfs_grid(Grid(arena))
+
+
+@measure_memory
+def dfs_grid(grid, stats=None):
     import time
-    import resource
 
     begin_time = time.time()
-
-    start_state = MazeState(arena)
-    frontier = []
-    frontier.append(start_state)
-    explored = set()
+    lap = PROFILER.lap('dfs') if PROFILER is not None else None
 
     max_nodes_stored = 1
 
     max_search_depth = 0
     nodes_expanded = 0
 
-    if (start_state.start == (-1, -1)) or (start_state.goal == (-1, -1)):
-        return [], -1, 0, 0, 0, time.time() - begin_time, 0
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
+
+    nodes = SearchNodes(grid)
+    parent, cost, action = nodes.parent, nodes.cost, nodes.action
+    passable = grid.passable
+    # Pushed in LDRU order so that they are popped in URDL order
+    offsets = tuple(reversed(tuple(enumerate(grid.offsets))))
+
+    cost[start] = 0
+    discovered = 1
+    frontier = [start]
+    if lap:
+        lap('setup')
 
     while len(frontier) != 0:
-        state = frontier.pop()
-        explored.add(state)
+        cell = frontier.pop()
 
-        if state.current_position == state.goal:
-            solution_path = mark_solution_path(state)
+        if cell == goal:
+            if lap:
+                lap('search', expanded=nodes_expanded, pushes=discovered, pops=nodes_expanded + 1)
+            solution_path = mark_solution_path(cell, nodes)
+            if lap:
+                lap('path')
 
-            ram_usage = resource.getrusage(
-                resource.RUSAGE_SELF).ru_maxrss / 1024
-            return (solution_path,  state.cost, nodes_expanded, max_nodes_stored, max_search_depth,  time.time() - begin_time, ram_usage)
+            return (solution_path,  cost[cell], nodes_expanded, max_nodes_stored, max_search_depth,  time.time() - begin_time, 0)
 
         nodes_expanded += 1
-        neighbors = state.expand()
-        neighbors.reverse()
-
-        for neighbor in neighbors:
-            if (neighbor not in explored) and (neighbor not in frontier):
+        neighbor_cost = cost[cell] + 1
+
+        for direction, offset in offsets:
+            neighbor = cell + offset
+            if passable[neighbor] and cost[neighbor] == -1:
+                cost[neighbor] = neighbor_cost
+                parent[neighbor] = cell
+                action[neighbor] = direction
                 frontier.append(neighbor)
+                discovered += 1
 
-                max_search_depth = max(max_search_depth, neighbor.cost)
+                if neighbor_cost > max_search_depth:
+                    max_search_depth = neighbor_cost
 
-                # max_search_depth = (max_search_depth,)  #
-        max_nodes_stored = max(max_nodes_stored, len(frontier) + len(explored))
+        if discovered > max_nodes_stored:
+            max_nodes_stored = discovered
 
-    return [], -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+    if lap:
+        lap('search', expanded=nodes_expanded, pushes=discovered, pops=nodes_expanded)
+    return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
 
 
 '''
 This function runs A* Search on the input arena (which is a list of str)
 Returns a ([], int) tuple where the [] represents the solved arena as a list of str and the int represents the cost of the solution
+The arena is compiled once into a Grid and the search itself runs in astar_grid
 '''
 
 
+class HeapOpenList:
+    '''
+    The A* open list as a binary heap of (f, push order, cell) entries, first in first out among equal f,
+    or with high_g of (f, -g, push order, cell) entries, deepest cells first among equal f
+    '''
+
+    def __init__(self, high_g=False):
+        import itertools
+
+        self.heap = []
+        self.order = itertools.count().__next__
+        self.push = self.push_high_g if high_g else self.push_fifo
+
+    def push_fifo(self, f, g, cell):
+        heapq.heappush(self.heap, (f, self.order(), cell))
+
+    def push_high_g(self, f, g, cell):
+        heapq.heappush(self.heap, (f, -g, self.order(), cell))
+
+    def pop(self):
+        return heapq.heappop(self.heap)[-1]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class BucketOpenList:
+    '''
+    The A* open list as a bucket queue: costs are unit and heuristics integers, so f only takes a few
+    values, each with a stack of its cells, and push and pop are O(1) apart from skipping emptied buckets.
+    Within a bucket the last cell pushed comes out first, which goes deep along plateaus of equal f, much
+    like breaking ties toward high g. A consistent heuristic never pushes an f below the current one,
+    a lower f still works by moving the current bucket back.
+    '''
+
+    def __init__(self):
+        self.buckets = []
+        self.base = 0
+        self.current = 0
+        self.size = 0
+
+    def push(self, f, g, cell):
+        if not self.buckets:
+            self.base = f
+        elif f < self.base:
+            self.buckets[:0] = [[] for _ in range(self.base - f)]
+            self.current += self.base - f
+            self.base = f
+        index = f - self.base
+        while index >= len(self.buckets):
+            self.buckets.append([])
+        self.buckets[index].append(cell)
+        if index < self.current:
+            self.current = index
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        while not buckets[self.current]:
+            self.current += 1
+        self.size -= 1
+        return buckets[self.current].pop()
+
+    def __len__(self):
+        return self.size
+
+
+# Open lists of A* by name, each a function returning an empty one
+OPEN_LISTS = {
+    'heap': HeapOpenList,
+    'heap-g': functools.partial(HeapOpenList, high_g=True),
+    'bucket': BucketOpenList,
+}
+
+
 def astar(arena):
+    return astar_grid(Grid(arena))
+
+
+@measure_memory
+def astar_grid(grid, heuristic=None, open_list=HeapOpenList, stats=None):
+    '''
+    The heuristic is a function from a cell index to an admissible and consistent estimate of its
+    distance to the goal, the Manhattan distance if None. The open list is a function returning an
+    empty open list (see OPEN_LISTS), entries left by a cell that got a lower cost since are stale and
+    skipped when popped.
+    '''
 
     # ================================================#
     # *#*#*# TODO: Write your A* algorithm here #*#*#*#
     # ================================================#
-    import heapq
     begin_time = time.time()
-    start_state = MazeState(arena)
-    frontier = []
+    lap = PROFILER.lap('astar') if PROFILER is not None else None
+    frontier = open_list()
+    push, pop = frontier.push, frontier.pop
 
-    explored = set()
-    # max_nodes_stored = 0
     max_nodes_stored = 1
     max_search_depth = 0
-
     nodes_expanded = 0
-    max_search_depth = 0
 
-    if start_state.start == (-1, -1) or start_state.goal == (-1, -1):
-        ram_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
-        return [], -1, 0, 0, 0,  time.time() - begin_time, ram_usage
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        return SolvedArena(grid, []), -1, 0, 0, 0,  time.time() - begin_time, 0
 
-    def heuristic(state):
-        return abs(state.goal[0] - state.current_position[0]) + abs(state.goal[1] - state.current_position[1])
-    f_start = start_state.cost+heuristic(start_state)
+    if heuristic is None:
+        heuristic = manhattan(grid, goal)
 
-    heapq.heappush(frontier, (f_start, id(start_state), start_state))
-    # Maps positions to the lowest cost to reach them
+    # The cost buffer maps cells to the lowest cost found so far to reach them
+    nodes = SearchNodes(grid)
+    parent, cost, action = nodes.parent, nodes.cost, nodes.action
+    passable = grid.passable
+    offsets = tuple(enumerate(grid.offsets))
+    explored = bytearray(grid.size)
+    explored_count = 0
+    stale = 0
 
-    cost_so_far = {start_state.current_position: start_state.cost}
+    cost[start] = 0
+    push(heuristic(start), 0, start)
+    if lap:
+        lap('setup')
 
     # Main loop
-    while frontier:
-        _, _, state = heapq.heappop(frontier)
-        if state.current_position in explored:
+    while len(frontier):
+        cell = pop()
+        if explored[cell]:
+            stale += 1
             continue
 
-        explored.add(state.current_position)
-
-        if (state.current_position == state.goal):
-            solution_path = mark_solution_path(state)
-            ram_usage = resource.getrusage(
-                resource.RUSAGE_SELF).ru_maxrss / 1024
-            return (solution_path,   state.cost,  nodes_expanded,
+        explored[cell] = 1
+        explored_count += 1
+
+        if cell == goal:
+            if lap:
+                lap('search', expanded=nodes_expanded, pops=explored_count + stale,
+                    pushes=explored_count + stale + len(frontier), stale=stale)
+            solution_path = mark_solution_path(cell, nodes)
+            if lap:
+                lap('path')
+            return (solution_path,   cost[cell],  nodes_expanded,
                     max_nodes_stored, max_search_depth,
-                    time.time() - begin_time, ram_usage)
+                    time.time() - begin_time, 0)
 
         nodes_expanded += 1
+        new_cost = cost[cell] + 1
 
-        for neighbor in state.expand():
-            new_cost = state.cost + 1
-            neighbor_position = neighbor.current_position
-
-            if (neighbor_position not in cost_so_far) or (new_cost < cost_so_far[neighbor_position]):
-                cost_so_far[neighbor_position] = new_cost
+        for direction, offset in offsets:
+            neighbor = cell + offset
+            if not passable[neighbor]:
+                continue
 
-                neighbor.cost = new_cost
-                f_neighbor = (new_cost + heuristic(neighbor))
-                heapq.heappush(frontier, (f_neighbor, id(neighbor), neighbor))
-                max_search_depth = max(max_search_depth, neighbor.cost)
+            if cost[neighbor] == -1 or new_cost < cost[neighbor]:
+                cost[neighbor] = new_cost
+                parent[neighbor] = cell
+                action[neighbor] = direction
+                push(new_cost + heuristic(neighbor), new_cost, neighbor)
+                if new_cost > max_search_depth:
+                    max_search_depth = new_cost
 
-        max_nodes_stored = max(max_nodes_stored, len(frontier) + len(explored))
+        max_nodes_stored = max(max_nodes_stored, len(frontier) + explored_count)
 
     # If no solution
-    ram_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
-    return [], -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, ram_usage
+    if lap:
+        lap('search', expanded=nodes_expanded, pops=explored_count + stale, pushes=explored_count + stale, stale=stale)
+    return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
     # =================================#
     # *#*#*# Your code ends here #*#*#*#
     # =================================#
 
 
+class ARAStar:
+    '''
+    Anytime Repairing A* (ARA*): a weighted A* (f = g + weight * h) that finds a first path quickly, then
+    lowers the weight and repairs its search instead of starting over, each path costing at most bound
+    times the optimal cost:
+    - Weight and Decrement (the inflation of the heuristic, lowered by decrement after every path, down to 1)
+    - Cost and Parent (the lowest cost found to every cell and its parent, -1 if unreached, kept across iterations)
+    - Open (heap of (f, g, cell), entries whose g is no longer the cell's cost being stale and skipped when popped)
+    - Closed (the iteration in which each cell was last expanded) and Incons (cells whose cost dropped after
+      they were closed, put back in the open list at the next iteration)
+    - Path, Best and Bound (the path, cost and suboptimality bound of the last completed iteration)
+    search can be called again with more time or nodes and carries on where the previous call stopped.
+    '''
+
+    def __init__(self, grid, weight=3.0, decrement=0.5, heuristic=None):
+        if weight < 1:
+            raise ValueError("The weight of ARA* is at least 1, not %g" % weight)
+        self.grid = grid
+        self.weight = float(weight)
+        self.decrement = decrement
+        self.heuristic = manhattan(grid, grid.goal) if heuristic is None else heuristic
+
+        self.cost = array('i', [-1]) * grid.size
+        self.parent = array('i', [-1]) * grid.size
+        self.closed = array('i', bytes(4 * grid.size))
+        self.iteration = 1
+        self.open = []
+        self.incons = set()
+
+        self.path = []
+        self.best = -1
+        self.bound = None
+        self.iterations = 0
+        self.finished = grid.start == -1 or grid.goal == -1
+
+        self.nodes_expanded = 0
+        self.max_nodes_stored = 1
+        self.max_search_depth = 0
+        if not self.finished:
+            self.cost[grid.start] = 0
+            self.open.append((self.weight * self.heuristic(grid.start), 0, grid.start))
+
+    def improve(self, deadline=None, node_limit=None):
+        '''
+        Expands cells until no open cell has a lower f than the cost of the goal (True), or until the
+        deadline (time.time()) or the node limit (total nodes expanded) is reached first (False)
+        '''
+        cost, parent, closed, open_list, incons = self.cost, self.parent, self.closed, self.open, self.incons
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        heuristic = self.heuristic
+        weight = self.weight
+        iteration = self.iteration
+        goal = self.grid.goal
+
+        while True:
+            while open_list and open_list[0][1] != cost[open_list[0][2]]:
+                heapq.heappop(open_list)
+            if not open_list or (cost[goal] != -1 and cost[goal] <= open_list[0][0]):
+                return True
+            if node_limit is not None and self.nodes_expanded >= node_limit:
+                return False
+            # time.time() every 64 expansions only
+            if deadline is not None and self.nodes_expanded & 63 == 0 and time.time() >= deadline:
+                return False
+
+            _, new_cost, cell = heapq.heappop(open_list)
+            closed[cell] = iteration
+            self.nodes_expanded += 1
+            new_cost += 1
+            for offset in offsets:
+                neighbor = cell + offset
+                if passable[neighbor] and (cost[neighbor] == -1 or new_cost < cost[neighbor]):
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = cell
+                    if closed[neighbor] == iteration:
+                        incons.add(neighbor)
+                    else:
+                        heapq.heappush(open_list, (new_cost + weight * heuristic(neighbor), new_cost, neighbor))
+                    if new_cost > self.max_search_depth:
+                        self.max_search_depth = new_cost
+            self.max_nodes_stored = max(self.max_nodes_stored, len(open_list) + len(incons))
+
+    def publish(self):
+        '''
+        Keeps the path of a completed iteration with its bound, then starts the next one with a lower weight
+        '''
+        cost, heuristic, goal = self.cost, self.heuristic, self.grid.goal
+        self.iterations += 1
+        if cost[goal] == -1:
+            self.finished = True
+            return
+
+        path = [goal]
+        while self.parent[path[-1]] != -1:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        # Parents may have got cheaper since they were set, the path is then shorter than the cost of the goal
+        self.path, self.best = path, len(path) - 1
+
+        # The optimal cost is at least the lowest g + h of the cells still open or inconsistent
+        cells = {cell for _, g, cell in self.open if g == cost[cell]} | self.incons
+        lower = min((cost[cell] + heuristic(cell) for cell in cells), default=self.best)
+        self.bound = max(1.0, min(self.weight, self.best / lower)) if lower > 0 else 1.0
+        if self.weight <= 1.0:
+            self.bound = 1.0
+        if self.bound <= 1.0:
+            self.finished = True
+            return
+
+        self.weight = max(1.0, self.weight - self.decrement)
+        self.iteration += 1
+        self.open = [(cost[cell] + self.weight * heuristic(cell), cost[cell], cell) for cell in cells]
+        heapq.heapify(self.open)
+        self.incons = set()
+
+    def search(self, deadline=None, node_budget=None, stats=None):
+        '''
+        Improves the path for at most deadline seconds and node_budget expansions (both unlimited if None)
+        and returns the usual 7-tuple of the best path so far, no solution if no iteration completed yet.
+        The nodes expanded are those of every call so far. The bound, the number of completed iterations,
+        the current weight and whether the path is known to be optimal are stored in stats.
+        '''
+        begin_time = time.time()
+        deadline_time = begin_time + deadline if deadline is not None else None
+        node_limit = self.nodes_expanded + node_budget if node_budget is not None else None
+        while not self.finished and self.improve(deadline_time, node_limit):
+            self.publish()
+
+        if stats is not None:
+            if self.bound is not None:
+                stats['bound'] = self.bound
+            stats['iterations'] = self.iterations
+            stats['weight'] = self.weight
+            stats['optimal'] = int(self.finished and self.best != -1 and self.bound == 1.0)
+        solution_path = render_path(self.grid, self.path)
+        return (solution_path, self.best, self.nodes_expanded, self.max_nodes_stored, self.max_search_depth,
+                time.time() - begin_time, 0)
+
+
+'''
+This function runs anytime ARA* on the input arena (which is a list of str)
+Returns the same tuple as astar, the best path found before the deadline or node budget
+The arena is compiled once into a Grid and the search itself runs in ara_grid
+'''
+
+
+def ara(arena, weight=3.0, deadline=None, node_budget=None):
+    return ara_grid(Grid(arena), weight, deadline=deadline, node_budget=node_budget)
+
+
+@measure_memory
+def ara_grid(grid, weight=3.0, decrement=0.5, deadline=None, node_budget=None, heuristic=None, stats=None):
+    '''
+    The deadline is in seconds and the heuristic the Manhattan distance if None, see ARAStar.search.
+    Without a deadline or node budget the search runs until its path is optimal.
+    '''
+    return ARAStar(grid, weight, decrement, heuristic).search(deadline, node_budget, stats)
+
+
 '''
 This function runs Iterative Deepening A* Search on the input arena (which is a list of str)
 Returns a ([], int) tuple where the [] represents the solved arena as a list of str and the int represents the cost of the solution
+The arena is compiled once into a Grid and the search itself runs in ida_grid
 '''
 
+# Number of cells the IDA* transposition table may hold per iteration, when --ida-table is given without N
+IDA_TABLE_SIZE = 1 << 20
+
 
 def ida(arena):
-    import time
-    import resource
-    import sys
+    return ida_grid(Grid(arena))
 
-    # Increase the recursion  why it doesnt work??????
-    sys.setrecursionlimit(1000000)
+
+@measure_memory
+def ida_grid(grid, in_path=False, table_size=0, heuristic=None, stats=None):
+    '''
+    The depth first search of each threshold runs on an explicit stack, so deep solutions do not recurse.
+    Two optional prunings cut revisits within a threshold, both off by default so that plain IDA* expands
+    the same nodes as before them:
+    - in_path skips cells that are already on the current path (cycles)
+    - table_size bounds a transposition table of the lowest cost each cell was expanded with,
+      a revisit at the same or a higher cost is skipped (0 disables it)
+    Neither changes the cost of the solution. If stats is a dict, the number of iterations and of
+    revisits cut by each pruning are stored in it. The heuristic is the same as astar_grid's.
+    '''
+    import time
 
     begin_time = time.time()
+    lap = PROFILER.lap('ida') if PROFILER is not None else None
 
-    start_state = MazeState(arena)
+    start, goal = grid.start, grid.goal
 
     # invalid start
-    if start_state.start == (-1, -1) or start_state.goal == (-1, -1):
-        return [], -1, 0, 0, 0, time.time() - begin_time, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if start == -1 or goal == -1:
+        if stats is not None:
+            stats['iterations'] = stats['pruned_in_path'] = stats['pruned_transpositions'] = 0
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
 
-    def heuristic(state):
-        # Manha
-        return (abs(state.goal[0] - state.current_position[0]) + abs(state.goal[1] - state.current_position[1]))
+    passable = grid.passable
+    offsets = grid.offsets
+
+    if heuristic is None:
+        heuristic = manhattan(grid, goal)
 
     nodes_expanded = 0
 
     max_nodes_stored = 1
     max_search_depth = 0
 
-    threshold = heuristic(start_state)
+    iterations = 0
+    pruned_in_path = 0
+    pruned_table = 0
+    on_path = bytearray(grid.size)
+
+    threshold = heuristic(start)
+    found = False
+    if lap:
+        lap('setup')
 
     while True:
+        iterations += 1
         min_threshold = float('inf')
-        path = [start_state]
-
-        # def dfs(arena):
-        # 	import time
-        # 	import resource
-        #
-        # 	begin_time = time.time()
-        #
-        # 	start_state = MazeState(arena)
-        # 	frontier = []
-        # 	frontier.append(start_state)
-        # 	explored = set()
-        #
-        # 	max_nodes_stored = 1
-        #
-        # 	max_search_depth = 0
-        # 	nodes_expanded = 0
-        #
-        # 	if (start_state.start == (-1, -1)) or (start_state.goal == (-1, -1)):
-        # 		return [], -1, 0, 0, 0, time.time() - begin_time, 0
-        #
-        # 	while len(frontier) != 0:
-        # 		state = frontier.pop()
-        # 		explored.add(state)
-        #
-        # 		if state.current_position == state.goal:
-        # 			solution_path = mark_solution_path(state)
-        #
-        # 			ram_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
-        # 			return (solution_path, state.cost, nodes_expanded, max_nodes_stored, max_search_depth,
-        # 					time.time() - begin_time, ram_usage)
-        #
-        # 		nodes_expanded += 1
-        # 		neighbors = state.expand()
-        # 		neighbors.reverse()
-        #
-        # 		for neighbor in neighbors:
-        # 			if (neighbor not in explored) and (neighbor not in frontier):
-        # 				frontier.append(neighbor)
-        #
-        # 				max_search_depth = max(max_search_depth, neighbor.cost)  #
-        #
-        # 		# max_search_depth = (max_search_depth,)  #
-        # 		max_nodes_stored = max(max_nodes_stored, len(frontier) + len(explored))
-        #
-        # 	return [], -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
-
-        def dfs(state, g):
-
-            nonlocal nodes_expanded, max_nodes_stored, max_search_depth, min_threshold
+        table = {start: 0} if table_size > 0 else None
+
+        # The current path is the only search state IDA* keeps, next_move holds the next direction to try at each of its cells
+        path = [start]
+        next_move = [0]
+        on_path[start] = 1
+        nodes_expanded += 1
+        found = start == goal
+
+        while path and not found:
+            cell = path[-1]
+            direction = next_move[-1]
+            if direction == 4:
+                # Every direction tried, backtrack
+                on_path[cell] = 0
+                path.pop()
+                next_move.pop()
+                continue
+            next_move[-1] = direction + 1
+
+            neighbor = cell + offsets[direction]
+            if not passable[neighbor]:
+                continue
+            g = len(path)
+
+            if in_path and on_path[neighbor]:
+                pruned_in_path += 1
+                continue
+            if table is not None:
+                best = table.get(neighbor)
+                if best is not None and best <= g:
+                    pruned_table += 1
+                    continue
 
             nodes_expanded += 1
-            f = g + heuristic(state)
+            f = g + heuristic(neighbor)
             if f > threshold:
                 if f < min_threshold:
                     min_threshold = f
-                return False
+                continue
 
-            if state.current_position == state.goal:
-                return True  # Goal found
+            path.append(neighbor)
+            if neighbor == goal:
+                found = True  # Goal found
+                break
+
+            if table is not None and (best is not None or len(table) < table_size):
+                table[neighbor] = g
+            on_path[neighbor] = 1
+            next_move.append(0)
 
             if len(path) > max_nodes_stored:
                 max_nodes_stored = len(path)
             if g > max_search_depth:
                 max_search_depth = g
 
-            for neighbor in state.expand():
-                path.append(neighbor)
+        for cell in path:
+            on_path[cell] = 0
 
-                if dfs(neighbor, g + 1):
-                    return True
-                path.pop()
+        if found or min_threshold == float('inf'):
+            break
 
-            return False
+        threshold = min_threshold
 
-            # ram_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-        found = dfs(start_state, 0)
-        if found:
-            solution_path = mark_solution_path(path[-1])
-            ram_usage = resource.getrusage(
-                resource.RUSAGE_SELF).ru_maxrss / 1024
-            return (solution_path, len(path) - 1, nodes_expanded, max_nodes_stored, max_search_depth + 1,
-                    time.time() - begin_time, ram_usage)
+    if lap:
+        lap('search', expanded=nodes_expanded, iterations=iterations, pruned_in_path=pruned_in_path,
+            pruned_transpositions=pruned_table)
+    if stats is not None:
+        stats['iterations'] = iterations
+        stats['pruned_in_path'] = pruned_in_path
+        stats['pruned_transpositions'] = pruned_table
 
-        if min_threshold == float('inf'):
+    if found:
+        solution_path = render_path(grid, path)
+        if lap:
+            lap('path')
+        return (solution_path, len(path) - 1, nodes_expanded, max_nodes_stored, max_search_depth + 1,
+                time.time() - begin_time, 0)
 
-            ram_usage = resource.getrusage(
-                resource.RUSAGE_SELF).ru_maxrss / 1024
-            # ram_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth + 1, time.time() - begin_time, 0
 
-            return [], -1, nodes_expanded, max_nodes_stored, max_search_depth + 1, time.time() - begin_time, ram_usage
 
-        threshold = min_threshold
+'''
+This function runs Jump Point Search on the input arena (which is a list of str)
+Returns a ([], int) tuple where the [] represents the solved arena as a list of str and the int represents the cost of the solution
+The arena is compiled once into a Grid and the search itself runs in jps_grid
+'''
 
-        # =================================================#
-        # *#*#*# TODO: Write your IDA algorithm here #*#*#*#
-        # =================================================#
 
-        # =================================#
-        # *#*#*# Your code ends here #*#*#*#
-        # =================================#
+def jump_tables(grid, goal):
+    '''
+    Returns the byte masks Jump Point Search stops on, computed for the whole grid at once with big integer
+    bit operations (one byte per cell, so that shifting by 8 bits moves by one cell):
+    - stop_right, stop_left (row major, 1 where a horizontal jump in that direction stops)
+    - stop_down, stop_up (column major, 1 where a vertical jump in that direction stops)
+    - passable_t (column major copy of the passability mask)
+    A jump is then a search for the next wall and the next stop in a bytes object.
+    '''
+    width, height, size = grid.width, grid.rows + 2, grid.size
+    ones = int.from_bytes(b'\x01' * size, 'little')
+    open_cells = int.from_bytes(grid.passable, 'little')
+    walls = open_cells ^ ones
+    goal_cell = 1 << 8 * goal
+
+    # Moving horizontally, an open cell above or below with a wall behind it is a forced neighbor
+    up, down = open_cells << 8 * width, open_cells >> 8 * width
+    stop_right = ((up & (walls << 8 * (width + 1))) | (down & (walls >> 8 * (width - 1))) | goal_cell) & open_cells
+    stop_left = ((up & (walls << 8 * (width - 1))) | (down & (walls >> 8 * (width + 1))) | goal_cell) & open_cells
+
+    # Cells from which a horizontal jump finds a stop, by doubling the reach of each cell along its open run
+    reach_right, reach_left = stop_right, stop_left
+    run_right = run_left = open_cells
+    k = 1
+    while k < width:
+        reach_right |= run_right & (reach_right >> 8 * k)
+        reach_left |= run_left & (reach_left << 8 * k)
+        run_right &= run_right >> 8 * k
+        run_left &= run_left << 8 * k
+        k *= 2
+    horizontal = (reach_right >> 8) | (reach_left << 8)
+
+    # Moving vertically, the same forced neighbor rule on the sides, plus every cell a horizontal jump leaves from
+    left, right = open_cells << 8, open_cells >> 8
+    stop_down = (left & (walls << 8 * (width + 1))) | (right & (walls << 8 * (width - 1)))
+    stop_up = (left & (walls >> 8 * (width - 1))) | (right & (walls >> 8 * (width + 1)))
+    stop_down = (stop_down | horizontal | goal_cell) & open_cells
+    stop_up = (stop_up | horizontal | goal_cell) & open_cells
+
+    def column_major(mask):
+        if isinstance(mask, int):
+            mask = (mask & ones).to_bytes(size, 'little')
+        return b''.join(mask[col::width] for col in range(width))
+
+    return ((stop_right & ones).to_bytes(size, 'little'), (stop_left & ones).to_bytes(size, 'little'),
+            column_major(stop_down), column_major(stop_up), column_major(grid.passable))
+
+
+def jps(arena):
+    return jps_grid(Grid(arena))
+
+
+@measure_memory
+def jps_grid(grid, stats=None):
+    '''
+    A* over jump points for the 4-connected unit cost grid, with the Manhattan heuristic.
+    From each cell the search jumps in a straight line and only stops at the goal, at a cell with a
+    forced neighbor (an open side cell whose cell behind is blocked) or, when moving vertically, at a
+    cell from which a horizontal jump finds such a point. The cost between two jump points is their
+    Manhattan distance, so the solution is as optimal as the one of astar_grid.
+    If stats is a dict, the number of jump points pushed is stored in it.
+    '''
+    import heapq
+    begin_time = time.time()
+
+    max_nodes_stored = 1
+    max_search_depth = 0
+    nodes_expanded = 0
+
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        if stats is not None:
+            stats['jump_points'] = 0
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
+
+    width = grid.width
+    passable = grid.passable
+    goal_row, goal_col = divmod(goal, width)
+    height = grid.rows + 2
+
+    def heuristic(cell):
+        row, col = divmod(cell, width)
+        return abs(goal_row - row) + abs(goal_col - col)
+
+    # Every jump is two C level byte searches, one for the next wall and one for the next stop before it
+    stop_right, stop_left, stop_down, stop_up, passable_t = jump_tables(grid, goal)
+
+    def jump_horizontal(cell, step):
+        if step == 1:
+            wall = passable.find(b'\x00', cell)
+            jump_point = stop_right.find(1, cell, wall)
+        else:
+            wall = passable.rfind(b'\x00', 0, cell + 1)
+            jump_point = stop_left.rfind(1, wall + 1, cell + 1)
+        return jump_point
+
+    def jump_vertical(cell, step):
+        row, col = divmod(cell, width)
+        index = col * height + row
+        if step > 0:
+            wall = passable_t.find(0, index)
+            jump_point = stop_down.find(1, index, wall)
+        else:
+            wall = passable_t.rfind(0, 0, index + 1)
+            jump_point = stop_up.rfind(1, wall + 1, index + 1)
+        if jump_point == -1:
+            return -1
+        return (jump_point - col * height) * width + col
+
+    # Jump points found so far, with the lowest cost and the jump point they were reached from
+    cost = {start: 0}
+    parent = {start: -1}
+    closed = set()
+    # Among equal f the deeper jump point comes first, long straight jumps otherwise leave wide plateaus of equal f
+    frontier = [(heuristic(start), 0, 0, start)]
+    pushes = 0
+
+    while frontier:
+        _, _, _, cell = heapq.heappop(frontier)
+        if cell in closed:
+            continue
+        closed.add(cell)
+
+        if cell == goal:
+            # Fill the straight segments between consecutive jump points
+            jump_points = [cell]
+            while parent[cell] != -1:
+                cell = parent[cell]
+                jump_points.append(cell)
+            jump_points.reverse()
+            path = [start]
+            for target in jump_points[1:]:
+                step = width if abs(target - path[-1]) >= width else 1
+                if target < path[-1]:
+                    step = -step
+                path.extend(range(path[-1] + step, target + step, step))
+            if stats is not None:
+                stats['jump_points'] = pushes + 1
+            solution_path = render_path(grid, path)
+            return (solution_path, cost[goal], nodes_expanded, max_nodes_stored, max_search_depth,
+                    time.time() - begin_time, 0)
+
+        nodes_expanded += 1
+
+        # Only the directions that are not back towards the parent can lead to a shorter path
+        if parent[cell] == -1:
+            steps = (-width, 1, width, -1)
+        elif cell // width == parent[cell] // width:
+            step = 1 if cell > parent[cell] else -1
+            steps = (-width, width, step)
+        else:
+            step = width if cell > parent[cell] else -width
+            steps = (1, -1, step)
+
+        for step in steps:
+            if step == 1 or step == -1:
+                jump_point = jump_horizontal(cell + step, step)
+            else:
+                jump_point = jump_vertical(cell + step, step)
+            if jump_point == -1 or jump_point in closed:
+                continue
+
+            new_cost = cost[cell] + abs(jump_point - cell) // (width if abs(step) == width else 1)
+            if jump_point not in cost or new_cost < cost[jump_point]:
+                cost[jump_point] = new_cost
+                parent[jump_point] = cell
+                pushes += 1
+                heapq.heappush(frontier, (new_cost + heuristic(jump_point), -new_cost, pushes, jump_point))
+                if new_cost > max_search_depth:
+                    max_search_depth = new_cost
+
+        max_nodes_stored = max(max_nodes_stored, len(frontier) + len(closed))
+
+    if stats is not None:
+        stats['jump_points'] = pushes + 1
+    return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+
+def join_paths(forward, backward, meet):
+    '''
+    Returns the cells from the start to the goal of a bidirectional search that met at the given cell
+    '''
+    path = forward.path(meet)
+    path.extend(reversed(backward.path(meet)[:-1]))
+    return path
+
+
+'''
+This function runs Bidirectional Breadth First Search on the input arena (which is a list of str)
+Returns a ([], int) tuple where the [] represents the solved arena as a list of str and the int represents the cost of the solution
+The arena is compiled once into a Grid and the search itself runs in bibfs_grid
+'''
+
+
+def bibfs(arena):
+    return bibfs_grid(Grid(arena))
+
+
+@measure_memory
+def bibfs_grid(grid, stats=None):
+    '''
+    Breadth first searches from the start and from the goal, one whole layer at a time, always on the
+    side with the smaller frontier. Once a layer meets the other side the search stops, the best of the
+    meetings of that layer being a shortest path.
+    '''
+    begin_time = time.time()
+
+    max_nodes_stored = 2
+    max_search_depth = 0
+    nodes_expanded = 0
+
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0  # No solution
+
+    passable = grid.passable
+    offsets = tuple(enumerate(grid.offsets))
+    forward, backward = SearchNodes(grid), SearchNodes(grid)
+    forward.cost[start] = 0
+    backward.cost[goal] = 0
+    frontiers = {forward: [start], backward: [goal]}
+    discovered = 2
+
+    best, meet = (0, start) if start == goal else (-1, -1)
+
+    while meet == -1 and frontiers[forward] and frontiers[backward]:
+        nodes, other = (forward, backward) if len(frontiers[forward]) <= len(frontiers[backward]) else (backward, forward)
+        parent, cost, action = nodes.parent, nodes.cost, nodes.action
+        other_cost = other.cost
+        layer = []
+
+        for cell in frontiers[nodes]:
+            nodes_expanded += 1
+            neighbor_cost = cost[cell] + 1
+            for direction, offset in offsets:
+                neighbor = cell + offset
+                if passable[neighbor] and cost[neighbor] == -1:
+                    cost[neighbor] = neighbor_cost
+                    parent[neighbor] = cell
+                    action[neighbor] = direction
+                    layer.append(neighbor)
+                    discovered += 1
+                    if other_cost[neighbor] != -1 and (meet == -1 or neighbor_cost + other_cost[neighbor] < best):
+                        best, meet = neighbor_cost + other_cost[neighbor], neighbor
+
+        frontiers[nodes] = layer
+        if layer and cost[layer[0]] > max_search_depth:
+            max_search_depth = cost[layer[0]]
+        if discovered > max_nodes_stored:
+            max_nodes_stored = discovered
+
+    if meet == -1:
+        return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+    solution_path = render_path(grid, join_paths(forward, backward, meet))
+    return solution_path, best, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+
+'''
+This function runs Bidirectional A* Search on the input arena (which is a list of str)
+Returns a ([], int) tuple where the [] represents the solved arena as a list of str and the int represents the cost of the solution
+The arena is compiled once into a Grid and the search itself runs in biastar_grid
+'''
+
+
+def biastar(arena):
+    return biastar_grid(Grid(arena))
+
+
+@measure_memory
+def biastar_grid(grid, stats=None):
+    '''
+    A* from the start towards the goal and from the goal towards the start, each with the Manhattan
+    distance to its own target, expanding the side with the smaller open list. Every cell reached by
+    both sides is a candidate path. The search stops once the best candidate is no longer than the larger
+    of the two smallest f values, as every path not found yet goes through an open cell of each side.
+    '''
+    import heapq
+    begin_time = time.time()
+
+    max_nodes_stored = 2
+    max_search_depth = 0
+    nodes_expanded = 0
+
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
+
+    passable = grid.passable
+    offsets = tuple(enumerate(grid.offsets))
+
+    forward, backward = SearchNodes(grid), SearchNodes(grid)
+    forward.cost[start] = 0
+    backward.cost[goal] = 0
+    heuristics = {forward: manhattan(grid, goal), backward: manhattan(grid, start)}
+    frontiers = {forward: [(heuristics[forward](start), 0, start)], backward: [(heuristics[backward](goal), 0, goal)]}
+    explored = {forward: bytearray(grid.size), backward: bytearray(grid.size)}
+    explored_count = 0
+    pushes = 0
+
+    best, meet = (0, start) if start == goal else (-1, -1)
+
+    def top(nodes):
+        # Drops the explored entries at the top of the open list and returns its smallest f
+        frontier = frontiers[nodes]
+        while frontier and explored[nodes][frontier[0][2]]:
+            heapq.heappop(frontier)
+        return frontier[0][0] if frontier else None
+
+    while True:
+        forward_f, backward_f = top(forward), top(backward)
+        if forward_f is None or backward_f is None:
+            break
+        if meet != -1 and best <= max(forward_f, backward_f):
+            break
+
+        nodes, other = (forward, backward) if len(frontiers[forward]) <= len(frontiers[backward]) else (backward, forward)
+        parent, cost, action = nodes.parent, nodes.cost, nodes.action
+        other_cost = other.cost
+        heuristic = heuristics[nodes]
+        frontier = frontiers[nodes]
+
+        _, _, cell = heapq.heappop(frontier)
+        explored[nodes][cell] = 1
+        explored_count += 1
+        nodes_expanded += 1
+        new_cost = cost[cell] + 1
+
+        for direction, offset in offsets:
+            neighbor = cell + offset
+            if not passable[neighbor]:
+                continue
+
+            if cost[neighbor] == -1 or new_cost < cost[neighbor]:
+                cost[neighbor] = new_cost
+                parent[neighbor] = cell
+                action[neighbor] = direction
+                pushes += 1
+                heapq.heappush(frontier, (new_cost + heuristic(neighbor), pushes, neighbor))
+                if new_cost > max_search_depth:
+                    max_search_depth = new_cost
+                if other_cost[neighbor] != -1 and (meet == -1 or new_cost + other_cost[neighbor] < best):
+                    best, meet = new_cost + other_cost[neighbor], neighbor
+
+        max_nodes_stored = max(max_nodes_stored, len(frontiers[forward]) + len(frontiers[backward]) + explored_count)
+
+    if meet == -1:
+        return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+    solution_path = render_path(grid, join_paths(forward, backward, meet))
+    return solution_path, best, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+
+def wavefront(grid, source):
+    '''
+    Returns the BFS distance from the source cell to every cell of the grid as a NumPy int32 array over the
+    flat cells (the same values as distance_field, -1 for the unreachable ones), the number of the last
+    layer and the size of the largest one. The whole frontier advances at once: its URDL neighbors are
+    one array of cell indices, of which the unseen ones are deduplicated with an owner array instead of
+    a sort, so the Python overhead is per layer rather than per cell.
+    NumPy is only needed by the wavefront searches and is imported here.
+    '''
+    import numpy as np
+
+    # Walls are -2 so that the unseen passable cells are exactly the ones at -1
+    distance = np.where(np.frombuffer(grid.passable, dtype=np.uint8) == 1, -1, -2).astype(np.int32)
+    layer = widest = 0
+    if source != -1 and distance[source] == -1:
+        offsets = np.array(grid.offsets, dtype=np.intp)
+        owner = np.empty(grid.size, dtype=np.intp)
+        frontier = np.array([source], dtype=np.intp)
+        distance[source] = 0
+        widest = 1
+        while True:
+            neighbors = (frontier[:, None] + offsets).ravel()
+            neighbors = neighbors[distance[neighbors] == -1]
+            if neighbors.size == 0:
+                break
+            # A cell found several times keeps the one position its owner entry ends up with
+            positions = np.arange(neighbors.size)
+            owner[neighbors] = positions
+            frontier = neighbors[owner[neighbors] == positions]
+            layer += 1
+            distance[frontier] = layer
+            widest = max(widest, frontier.size)
+    distance[distance == -2] = -1
+    return distance, layer, widest
+
+
+'''
+This function runs a vectorized wavefront BFS on the input arena (which is a list of str)
+Returns the same tuple as bfs, the shortest path being extracted from the full distance map of the start
+The arena is compiled once into a Grid and the search itself runs in wave_grid
+'''
+
+
+def wave(arena):
+    return wave_grid(Grid(arena))
+
+
+@measure_memory
+def wave_grid(grid, stats=None):
+    '''
+    Every reachable cell is expanded (nodes expanded), the largest layer is the max nodes stored and the
+    last layer the max search depth. The distance map of the arena, a rows x cols NumPy array, is stored
+    in stats as 'distances'. The path goes back from the goal through any neighbor one step closer,
+    first in URDL order, so it can differ from the BFS one but has the same cost.
+    '''
+    import time
+
+    begin_time = time.time()
+
+    distance, max_search_depth, max_nodes_stored = wavefront(grid, grid.start)
+    if stats is not None:
+        stats['distances'] = distance.reshape(grid.rows + 2, grid.width)[1:-1, 1:-1]
+    nodes_expanded = int((distance >= 0).sum())
+
+    goal = grid.goal
+    if grid.start == -1 or goal == -1 or distance[goal] == -1:
+        return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0  # No solution
+
+    cost = int(distance[goal])
+    path = [goal]
+    cell = goal
+    for step in range(cost - 1, -1, -1):
+        cell = next(cell + offset for offset in grid.offsets if distance[cell + offset] == step)
+        path.append(cell)
+    path.reverse()
+
+    return render_path(grid, path), cost, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+
+'''
+This function runs a multi-source, multi-goal BFS on the input arena (which is a list of str)
+Returns the same tuple as bfs, the path going from the nearest start to the nearest goal
+The arena is compiled once into a Grid and the search itself runs in multi_bfs_grid
+'''
+
+
+def multi_bfs(arena):
+    return multi_bfs_grid(Grid(arena))
+
+
+@measure_memory
+def multi_bfs_grid(grid, sources=None, goals=None, stats=None):
+    '''
+    The sources and goals are cell indices, by default the start and goal of the grid plus every other 's'
+    and 'g' of the arena. Every source is in the first frontier at cost 0 and the search stops at the first
+    goal it dequeues, so one sweep finds the goal nearest to any source instead of one search per pair.
+    The numbers of sources and goals are stored in stats as 'sources' and 'goals'.
+    '''
+    from collections import deque
+    import time
+
+    begin_time = time.time()
+
+    if sources is None:
+        sources = [grid.start] + grid.marks('s')
+    if goals is None:
+        goals = [grid.goal] + grid.marks('g')
+    sources = [cell for cell in dict.fromkeys(sources) if cell != -1]
+    goals = [cell for cell in dict.fromkeys(goals) if cell != -1]
+    if stats is not None:
+        stats['sources'] = len(sources)
+        stats['goals'] = len(goals)
+    if not sources or not goals:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0  # No solution
+
+    is_goal = bytearray(grid.size)
+    for cell in goals:
+        is_goal[cell] = 1
+
+    nodes = SearchNodes(grid)
+    parent, cost = nodes.parent, nodes.cost
+    passable = grid.passable
+    offsets = grid.offsets
+
+    max_search_depth = 0
+    nodes_expanded = 0
+    for cell in sources:
+        cost[cell] = 0
+    discovered = max_nodes_stored = len(sources)
+    frontier = deque(sources)
+
+    while frontier:
+        cell = frontier.popleft()
+        if is_goal[cell]:
+            return (mark_solution_path(cell, nodes), cost[cell], nodes_expanded, max_nodes_stored, max_search_depth,
+                    time.time() - begin_time, 0)
+
+        nodes_expanded += 1
+        neighbor_cost = cost[cell] + 1
+        for offset in offsets:  # Expand in URDL order
+            neighbor = cell + offset
+            if passable[neighbor] and cost[neighbor] == -1:
+                cost[neighbor] = neighbor_cost
+                parent[neighbor] = cell
+                frontier.append(neighbor)
+                discovered += 1
+                if neighbor_cost > max_search_depth:
+                    max_search_depth = neighbor_cost
+
+        if discovered > max_nodes_stored:
+            max_nodes_stored = discovered
+
+    return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+
+class AbstractGraph:
+    '''
+    The abstract graph of hierarchical pathfinding (HPA*), built once per arena:
+    - Cluster size (the arena is cut into square clusters of that many cells a side)
+    - Edges (for every abstract node, a cell next to a cluster border, its neighbors and their distances:
+      cost 1 to its twin across the border, and the shortest distance within the cluster to the other
+      nodes of its cluster)
+    - Clusters (the nodes of every cluster, by (row, col) of the cluster)
+    The entrances between two clusters are the runs of open cells on both sides of their border, with a
+    transition in the middle of short runs and at both ends of long ones. Queries only search this graph,
+    and refine its path into cells when it is needed. Paths cannot leave and come back into a cluster
+    between two of its nodes, so their cost can be a little above the optimal one.
+    '''
+
+    # Entrances at least this long get two transitions
+    LONG_ENTRANCE = 6
+
+    def __init__(self, grid, cluster_size=10, edges=None):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.edges = edges
+        if edges is None:
+            self.edges = {}
+            self.add_entrances()
+
+        # The nodes of every cluster
+        self.clusters = {}
+        for node in self.edges:
+            self.clusters.setdefault(self.cluster(node), []).append(node)
+        if edges is not None:
+            return
+
+        try:
+            sources, targets, distances = self.cluster_distances()
+        except ImportError:
+            for nodes in self.clusters.values():
+                for node in nodes:
+                    distance = self.cluster_search(node)[0]
+                    for other in nodes:
+                        if other != node and other in distance:
+                            self.edges[node][other] = distance[other]
+            return
+        for node, other, distance in zip(sources, targets, distances):
+            self.edges[node][other] = distance
+
+    def cluster(self, cell):
+        row, col = self.grid.position(cell)
+        return row // self.cluster_size, col // self.cluster_size
+
+    def add_entrances(self):
+        grid = self.grid
+        size = self.cluster_size
+        passable = grid.passable
+
+        def add_transition(cell, other):
+            self.edges.setdefault(cell, {})[other] = 1
+            self.edges.setdefault(other, {})[cell] = 1
+
+        # Borders between clusters side by side (step across is +1), then one above the other (+width)
+        for across, lines, line_length in ((1, grid.cols, grid.rows), (grid.width, grid.rows, grid.cols)):
+            for border in range(size, lines, size):
+                for first in range(0, line_length, size):
+                    run = []
+                    for position in list(range(first, min(first + size, line_length))) + [None]:
+                        if position is not None:
+                            cell = (grid.index(position, border - 1) if across == 1
+                                    else grid.index(border - 1, position))
+                            if passable[cell] and passable[cell + across]:
+                                run.append(cell)
+                                continue
+                        if run:
+                            ends = ([run[len(run) // 2]] if len(run) < self.LONG_ENTRANCE
+                                    else [run[0], run[-1]])
+                            for cell in ends:
+                                add_transition(cell, cell + across)
+                            run = []
+
+    def cluster_distances(self):
+        '''
+        Returns the distances within their cluster between the nodes of every cluster, as the lists of the
+        (node, other node, distance) of every reachable pair, ordered by node and then by the rank of the other
+        node in its cluster (the order of the Python BFS). They come from one NumPy BFS over the whole grid
+        rather than one Python BFS per node: every cell holds a 64 bit mask of the nodes of its cluster that
+        reached it, so the BFS of all the nodes advance together and only the cells of the current layer are
+        touched. Moves across a cluster border are not allowed. Clusters of more than 64 nodes take one pass
+        per 64 of them. NumPy is imported here.
+        '''
+        import numpy as np
+
+        grid = self.grid
+        size = self.cluster_size
+        width = grid.width
+        passable = np.frombuffer(grid.passable, dtype=np.uint8)[:grid.size] != 0
+        cells = np.arange(grid.size)
+        rows, cols = (cells // width - 1) // size, (cells % width - 1) // size
+
+        # The moves allowed from every cell: to an open cell of the same cluster
+        moves = []
+        for offset in grid.offsets:
+            allowed = np.zeros(grid.size, dtype=bool)
+            if offset > 0:
+                allowed[:-offset] = (passable[:-offset] & passable[offset:] & (rows[:-offset] == rows[offset:])
+                                     & (cols[:-offset] == cols[offset:]))
+            else:
+                allowed[-offset:] = (passable[-offset:] & passable[:offset] & (rows[-offset:] == rows[:offset])
+                                     & (cols[-offset:] == cols[:offset]))
+            moves.append((offset, allowed))
+
+        # The rank of every node in its cluster, and the nodes of every cluster by number and rank
+        cluster_cols = -(-grid.cols // size)
+        rank = np.full(grid.size, -1, dtype=np.int64)
+        passes = max((len(nodes) for nodes in self.clusters.values()), default=0)
+        cluster_nodes = np.zeros((-(-grid.rows // size) * cluster_cols, passes), dtype=np.int64)
+        for (row, col), nodes in self.clusters.items():
+            rank[nodes] = np.arange(len(nodes))
+            cluster_nodes[row * cluster_cols + col, :len(nodes)] = nodes
+
+        found = []
+        for first in range(0, passes, 64):
+            frontier = np.flatnonzero((rank >= first) & (rank < first + 64))
+            bits = np.left_shift(np.uint64(1), (rank[frontier] - first).astype(np.uint64))
+            seen = np.zeros(grid.size, dtype=np.uint64)
+            seen[frontier] = bits
+            # The union of the nodes that reached every cell of the next layer, and the last entry of every cell
+            layer = np.zeros(grid.size, dtype=np.uint64)
+            last = np.zeros(grid.size, dtype=np.int64)
+            distance = 0
+            while len(frontier):
+                distance += 1
+                neighbors = []
+                for offset, allowed in moves:
+                    moving = allowed[frontier]
+                    # The cells of the frontier are distinct, so are their neighbors in one direction
+                    cells = frontier[moving] + offset
+                    layer[cells] |= bits[moving]
+                    neighbors.append(cells)
+                neighbors = np.concatenate(neighbors)
+                entries = np.arange(len(neighbors))
+                last[neighbors] = entries
+                frontier = neighbors[last[neighbors] == entries]
+                bits = layer[frontier] & ~seen[frontier]
+                layer[frontier] = 0
+                frontier, bits = frontier[bits != 0], bits[bits != 0]
+                seen[frontier] |= bits
+
+                # The (node reached, rank of the node it was reached from) of every bit new to a node
+                hits = rank[frontier] != -1
+                masks = np.unpackbits(bits[hits].astype('<u8').view(np.uint8).reshape(-1, 8), axis=1,
+                                      bitorder='little')
+                reached_nodes, reached_from = np.nonzero(masks)
+                found.append((frontier[hits][reached_nodes], reached_from + first,
+                              np.full(len(reached_nodes), distance)))
+
+        if not found:
+            return [], [], []
+        targets, ranks, distances = (np.concatenate(column) for column in zip(*found))
+        sources = cluster_nodes[rows[targets] * cluster_cols + cols[targets], ranks]
+        order = np.lexsort((rank[targets], sources))
+        return sources[order].tolist(), targets[order].tolist(), distances[order].tolist()
+
+    def cluster_search(self, source, target=-1):
+        '''
+        Returns the BFS distance and parent dicts of the cells of the source's cluster reachable from it
+        without leaving the cluster, stopping early at the target if any
+        '''
+        from collections import deque
+
+        grid = self.grid
+        size = self.cluster_size
+        row, col = self.cluster(source)
+        # Bounds in the bordered coordinates of the flat index
+        top, left = row * size + 1, col * size + 1
+        bottom, right = min(top + size, grid.rows + 1), min(left + size, grid.cols + 1)
+
+        passable = grid.passable
+        width = grid.width
+        distance = {source: 0}
+        parent = {source: -1}
+        frontier = deque([source])
+        while frontier:
+            cell = frontier.popleft()
+            if cell == target:
+                break
+            for offset in grid.offsets:
+                neighbor = cell + offset
+                if passable[neighbor] and neighbor not in distance:
+                    neighbor_row, neighbor_col = divmod(neighbor, width)
+                    if top <= neighbor_row < bottom and left <= neighbor_col < right:
+                        distance[neighbor] = distance[cell] + 1
+                        parent[neighbor] = cell
+                        frontier.append(neighbor)
+        return distance, parent
+
+    def search(self, start, goal, stats=None):
+        '''
+        Returns the abstract path (a list of cells, from the start to the goal) and its cost, or ([], -1).
+        The start and goal are linked to the nodes of their clusters for this query only, and to each
+        other if they share a cluster. The nodes expanded are stored in stats as 'nodes_expanded'.
+        '''
+        extra = {}
+        for endpoint in (start, goal):
+            if endpoint in self.edges or endpoint in extra:
+                continue
+            distance = self.cluster_search(endpoint)[0]
+            links = extra.setdefault(endpoint, {})
+            for node in self.clusters.get(self.cluster(endpoint), ()):
+                if node in distance:
+                    links[node] = distance[node]
+                    extra.setdefault(node, {})[endpoint] = distance[node]
+            if endpoint == start and goal in distance:
+                links[goal] = distance[goal]
+                extra.setdefault(goal, {})[start] = distance[goal]
+
+        heuristic = manhattan(self.grid, goal)
+        cost = {start: 0}
+        parent = {start: -1}
+        frontier = [(heuristic(start), 0, start)]
+        pushes = 0
+        nodes_expanded = 0
+        closed = set()
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node in closed:
+                continue
+            closed.add(node)
+            if node == goal:
+                break
+            nodes_expanded += 1
+            for neighbor, step in list(self.edges.get(node, {}).items()) + list(extra.get(node, {}).items()):
+                new_cost = cost[node] + step
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = node
+                    pushes += 1
+                    heapq.heappush(frontier, (new_cost + heuristic(neighbor), pushes, neighbor))
+
+        if stats is not None:
+            stats['nodes_expanded'] = nodes_expanded
+        if goal not in closed:
+            return [], -1
+        path = [goal]
+        while parent[path[-1]] != -1:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path, cost[goal]
+
+    def refine(self, path):
+        '''
+        Returns the cells of an abstract path, each transition being one step and each move within a
+        cluster its shortest path in that cluster
+        '''
+        cells = path[:1]
+        for node, next_node in zip(path, path[1:]):
+            if next_node - node in self.grid.offsets and self.cluster(node) != self.cluster(next_node):
+                cells.append(next_node)
+                continue
+            parent = self.cluster_search(node, next_node)[1]
+            segment = [next_node]
+            while segment[-1] != node:
+                segment.append(parent[segment[-1]])
+            cells.extend(reversed(segment[:-1]))
+        return cells
+
+    def edge_count(self):
+        return sum(len(neighbors) for neighbors in self.edges.values()) // 2
+
+    def save(self, filename):
+        '''
+        Writes the graph to a JSON file, with the digest of its arena so that it is only loaded for the same one
+        '''
+        import json
+
+        edges = [[node, neighbor, step] for node, neighbors in self.edges.items()
+                 for neighbor, step in neighbors.items() if node < neighbor]
+        with open(filename, 'w') as f:
+            json.dump({'digest': self.grid.digest(), 'cluster_size': self.cluster_size, 'edges': edges}, f)
+
+    @classmethod
+    def load(cls, grid, filename):
+        import json
+
+        with open(filename) as f:
+            saved = json.load(f)
+        if saved['digest'] != grid.digest():
+            raise ValueError(filename + " was built for another arena")
+        edges = {}
+        for node, neighbor, step in saved['edges']:
+            edges.setdefault(node, {})[neighbor] = step
+            edges.setdefault(neighbor, {})[node] = step
+        return cls(grid, saved['cluster_size'], edges)
+
+
+'''
+This function runs hierarchical pathfinding (HPA*) on the input arena (which is a list of str)
+Returns the same tuple as astar, the cost being the one of the refined path, which may be above the optimal one
+The arena is compiled once into a Grid and the search itself runs in hpa_grid
+'''
+
+
+def hpa(arena):
+    return hpa_grid(Grid(arena))
+
+
+@measure_memory
+def hpa_grid(grid, graph=None, cluster_size=10, stats=None):
+    '''
+    Searches the abstract graph of the grid, built here if none is given (its time then counts), and
+    refines its path. The nodes expanded and stored are abstract nodes and the search depth is the number
+    of abstract nodes on the path. If stats is a dict, the size of the graph is stored in it as
+    'abstract_nodes' and 'abstract_edges', and the time taken to build it here as 'graph_time'.
+    '''
+    import time
+
+    begin_time = time.time()
+
+    if graph is None:
+        graph_time = time.time()
+        graph = AbstractGraph(grid, cluster_size)
+        if stats is not None:
+            stats['graph_time'] = time.time() - graph_time
+    if stats is not None:
+        stats['abstract_nodes'] = len(graph.edges)
+        stats['abstract_edges'] = graph.edge_count()
+
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
+
+    search_stats = {}
+    path, cost = graph.search(start, goal, search_stats)
+    nodes_expanded = search_stats['nodes_expanded']
+    if not path:
+        return SolvedArena(grid, []), -1, nodes_expanded, len(graph.edges) + 2, 0, time.time() - begin_time, 0
+
+    solution_path = render_path(grid, graph.refine(path))
+    return (solution_path, cost, nodes_expanded, len(graph.edges) + 2, len(path) - 1,
+            time.time() - begin_time, 0)
+
+
+class Terrain:
+    '''
+    A weighted movement model over a grid, for the weighted searches only (the unit cost searches keep
+    using the Grid alone):
+    - Weights (flat bytearray over the bordered grid: 0 for walls, digits 1 to 9 are their own weight
+      and every other passable cell weighs 1)
+    - Moves ((offset, length, sides) per direction: URDL, plus the diagonals UR, DR, DL and UL when
+      8-connected, whose sides are the two orthogonal cells they pass between)
+    Entering a cell costs its weight times the length of the move, 1 straight and sqrt(2) diagonally.
+    Diagonal moves may not cut a corner, both of their sides must be open.
+    '''
+
+    _WEIGHTS = bytes(0 if b == ord('o') else b - ord('0') if ord('1') <= b <= ord('9') else 1 for b in range(256))
+
+    def __init__(self, grid, connectivity=4):
+        if connectivity not in (4, 8):
+            raise ValueError("Connectivity is 4 or 8, not %d" % connectivity)
+        self.grid = grid
+        self.connectivity = connectivity
+
+        self.weights = self.grid_weights(grid)
+        if self.weights is None:
+            raise ValueError("The grid was rebuilt from its passability mask and has lost the weights of its "
+                             "terrain, search the text map or a grid file written with its weights")
+        # The cheapest cell bounds the cost of every move, which keeps the heuristics admissible
+        self.min_weight = next((weight for weight in range(1, 10) if self.weights.find(bytes([weight])) != -1), 1)
+
+        up, right, down, left = grid.offsets
+        self.moves = tuple((offset, 1.0, None) for offset in grid.offsets)
+        if connectivity == 8:
+            self.moves += tuple((first + second, 2 ** 0.5, (first, second))
+                                for first, second in ((up, right), (down, right), (down, left), (up, left)))
+
+    @classmethod
+    def grid_weights(cls, grid):
+        '''
+        Returns the weights of a grid as a new bytearray: its weights plane if it has one, else the digits of
+        its arena. None for a grid rebuilt from a mask without a weights plane, whose arena has no digits.
+        '''
+        if grid.weights is not None:
+            return bytearray(grid.weights)
+        if grid.rebuilt:
+            return None
+        weights = bytearray(grid.size)
+        for i, row in enumerate(grid.arena):
+            base = grid.index(i, 0)
+            weights[base:base + len(row)] = row.encode('latin-1', 'replace').translate(cls._WEIGHTS)
+        return weights
+
+    def heuristic(self, goal):
+        '''
+        Returns the admissible heuristic of the movement model towards the goal cell: the Manhattan
+        distance when 4-connected, the octile distance when 8-connected, both times the lightest weight
+        '''
+        width = self.grid.width
+        goal_row, goal_col = divmod(goal, width)
+        weight = self.min_weight
+        diagonal = (2 ** 0.5 - 2) * weight
+
+        if self.connectivity == 4:
+            def heuristic(cell):
+                row, col = divmod(cell, width)
+                return weight * (abs(goal_row - row) + abs(goal_col - col))
+        else:
+            def heuristic(cell):
+                row, col = divmod(cell, width)
+                rows, cols = abs(goal_row - row), abs(goal_col - col)
+                # Octile distance: the shorter side diagonally, the rest straight
+                return weight * (rows + cols) + diagonal * min(rows, cols)
+        return heuristic
+
+
+def terrain_search(terrain, heuristic=None):
+    '''
+    Returns the usual 7-tuple of a best first search on the terrain, Dijkstra without a heuristic and A*
+    with one. The cost is a float when diagonal moves are taken, the search depth counts moves.
+    '''
+    import time
+
+    begin_time = time.time()
+
+    grid = terrain.grid
+    start, goal = grid.start, grid.goal
+    if start == -1 or goal == -1:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
+
+    if heuristic is None:
+        def heuristic(cell):
+            return 0
+
+    cost = array('d', [float('inf')]) * grid.size
+    parent = array('i', [-1]) * grid.size
+    depth = array('i', bytes(4 * grid.size))
+    explored = bytearray(grid.size)
+    weights = terrain.weights
+    moves = terrain.moves
+
+    max_nodes_stored = 1
+    max_search_depth = 0
+    nodes_expanded = 0
+    explored_count = 0
+
+    pushes = 0
+    cost[start] = 0.0
+    frontier = [(heuristic(start), pushes, start)]
+
+    while frontier:
+        _, _, cell = heapq.heappop(frontier)
+        if explored[cell]:
+            continue
+        explored[cell] = 1
+        explored_count += 1
+
+        if cell == goal:
+            path = [cell]
+            while parent[path[-1]] != -1:
+                path.append(parent[path[-1]])
+            path.reverse()
+            goal_cost = cost[cell]
+            goal_cost = int(goal_cost) if goal_cost.is_integer() else round(goal_cost, 6)
+            return (render_path(grid, path), goal_cost, nodes_expanded, max_nodes_stored, max_search_depth,
+                    time.time() - begin_time, 0)
+
+        nodes_expanded += 1
+        cell_cost = cost[cell]
+        for offset, length, sides in moves:
+            neighbor = cell + offset
+            weight = weights[neighbor]
+            if not weight or (sides is not None and not (weights[cell + sides[0]] and weights[cell + sides[1]])):
+                continue
+            new_cost = cell_cost + weight * length
+            if new_cost < cost[neighbor]:
+                cost[neighbor] = new_cost
+                parent[neighbor] = cell
+                depth[neighbor] = depth[cell] + 1
+                if depth[neighbor] > max_search_depth:
+                    max_search_depth = depth[neighbor]
+                pushes += 1
+                heapq.heappush(frontier, (new_cost + heuristic(neighbor), pushes, neighbor))
+
+        max_nodes_stored = max(max_nodes_stored, len(frontier) + explored_count)
+
+    return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+
+'''
+These functions run Dijkstra and A* on the input arena (which is a list of str) read as weighted terrain,
+where digits are cell weights, 4 or 8-connected
+Returns the same tuple as astar, the cost being the sum of the weights of the cells entered (times sqrt(2) diagonally)
+The arena is compiled once into a Grid and a Terrain, and the searches run in dijkstra_grid and terrain_astar_grid
+'''
+
+
+def dijkstra(arena, connectivity=4):
+    return dijkstra_grid(Grid(arena), connectivity)
+
+
+@measure_memory
+def dijkstra_grid(grid, connectivity=4, terrain=None, stats=None):
+    if terrain is None:
+        terrain = Terrain(grid, connectivity)
+    return terrain_search(terrain)
+
+
+def terrain_astar(arena, connectivity=4):
+    return terrain_astar_grid(Grid(arena), connectivity)
+
+
+@measure_memory
+def terrain_astar_grid(grid, connectivity=4, terrain=None, heuristic=None, stats=None):
+    '''
+    The heuristic is the terrain's own (weighted Manhattan or octile distance) if None
+    '''
+    if terrain is None:
+        terrain = Terrain(grid, connectivity)
+    return terrain_search(terrain, terrain.heuristic(grid.goal) if heuristic is None else heuristic)
+
+
+ALGORITHMS = {
+    'bfs': bfs_grid,
+    'dfs': dfs_grid,
+    'astar': astar_grid,
+    'ida': ida_grid,
+    'jps': jps_grid,
+    'bibfs': bibfs_grid,
+    'biastar': biastar_grid,
+    'wave': wave_grid,
+    'hpa': hpa_grid,
+    'dijkstra': dijkstra_grid,
+    'terrain_astar': terrain_astar_grid,
+    'multibfs': multi_bfs_grid,
+    'ara': ara_grid,
+}
+
+# The searches that -prune applies to: unit cost, from the one start to the one goal of the grid. The
+# weighted ones read the arena, multibfs has other sources and goals, and the HPA* graph is kept for any goal.
+PRUNED_SEARCHES = ('bfs', 'dfs', 'astar', 'ida', 'jps', 'bibfs', 'biastar', 'wave', 'ara')
+
+
+class BatchSolver:
+    '''
+    Answers many start/goal queries against one arena, reusing everything that only depends on the arena:
+    - Grid (the compiled arena, queries only move its start and goal)
+    - Labels (the connected component of every cell, so that unreachable goals are answered at once)
+    - Landmarks (optional BFS distance tables from a few far apart cells, for the ALT heuristic of A*)
+    - Exact (whether A* and IDA* use the exact heuristic, whose fields are shared by queries with the same goal)
+    - Graph (the HPA* abstract graph with clusters of cluster_size cells, built by the first HPA* query,
+      and the time it took)
+    - Terrain (the weights and moves of the weighted searches, with the given connectivity, built by the
+      first weighted query)
+    '''
+
+    def __init__(self, grid, landmarks=0, exact=False, cluster_size=10, connectivity=4):
+        self.grid = grid
+        self.exact = exact
+        self.cluster_size = cluster_size
+        self.connectivity = connectivity
+        self.terrain = None
+        self.graph = None
+        self.graph_time = 0.0
+        if exact:
+            # Hashed once here rather than in every with_endpoints copy
+            grid.digest()
+        self.labels = component_labels(grid)
+        self.landmarks = []
+        self.landmark_tables = []
+        # Distance from every cell to its nearest landmark, -1 for the unreachable ones
+        self.nearest = None
+        for _ in range(landmarks):
+            landmark = self.farthest_cell()
+            if landmark == -1:
+                break
+            self.landmarks.append(landmark)
+            self.landmark_tables.append(distance_field(grid, landmark))
+            self.add_nearest(self.landmark_tables[-1])
+
+    def add_nearest(self, table):
+        '''
+        Lowers the distance to the nearest landmark with the distance table of a new one, elementwise in
+        NumPy when it is available and with map of min otherwise, never cell by cell in Python
+        '''
+        if self.nearest is None:
+            self.nearest = array('i', table)
+            return
+        try:
+            import numpy as np
+        except ImportError:
+            self.nearest = array('i', map(min, self.nearest, table))
+            return
+        nearest = np.frombuffer(self.nearest, dtype=np.int32)
+        np.minimum(nearest, np.frombuffer(table, dtype=np.int32), out=nearest)
+
+    def farthest_cell(self):
+        '''
+        Returns the cell farthest from the landmarks chosen so far (from the start, or the first open cell, for
+        the first one), the first in index order of the farthest ones, -1 if none is farther than 0
+        '''
+        nearest = self.nearest
+        if nearest is None:
+            source = self.grid.start if self.grid.start != -1 else self.grid.passable.find(b'\x01')
+            nearest = distance_field(self.grid, source)
+
+        try:
+            import numpy as np
+        except ImportError:
+            best = max(nearest, default=0)
+            return nearest.index(best) if best > 0 else -1
+        farthest = int(np.frombuffer(nearest, dtype=np.int32).argmax())
+        return farthest if nearest[farthest] > 0 else -1
+
+    def heuristic(self, goal):
+        '''
+        Returns the ALT heuristic towards the goal cell: the largest of the Manhattan distance and of the
+        triangle inequality bounds |d(L, goal) - d(L, cell)| of the landmarks L
+        '''
+        base = manhattan(self.grid, goal)
+        tables = [(table, table[goal]) for table in self.landmark_tables if table[goal] != -1]
+        if not tables:
+            return base
+
+        def heuristic(cell):
+            h = base(cell)
+            for table, to_goal in tables:
+                bound = table[cell] - to_goal
+                if bound < 0:
+                    bound = -bound
+                if bound > h:
+                    h = bound
+            return h
+        return heuristic
+
+    def solve(self, start, goal, algorithm='astar'):
+        '''
+        Runs the algorithm from start to goal, both (row, col), and returns its usual 7-tuple
+        '''
+        begin_time = time.time()
+        grid = self.grid.with_endpoints(start, goal)
+        label = self.labels[grid.start]
+        if label == 0 or label != self.labels[grid.goal]:
+            return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
+
+        if self.exact and algorithm in ('astar', 'ida'):
+            return ALGORITHMS[algorithm](grid, heuristic=exact_heuristic(grid, grid.goal))
+        if algorithm == 'astar' and self.landmark_tables:
+            return astar_grid(grid, heuristic=self.heuristic(grid.goal))
+        if algorithm == 'hpa':
+            if self.graph is None:
+                try:
+                    import numpy  # Imported before the graph is built so that it is not in its time
+                except ImportError:
+                    pass
+                graph_time = time.time()
+                self.graph = AbstractGraph(self.grid, self.cluster_size)
+                self.graph_time = time.time() - graph_time
+            return hpa_grid(grid, graph=self.graph)
+        if algorithm == 'multibfs':
+            # Only the query's endpoints, not the 's' and 'g' marks of the arena
+            return multi_bfs_grid(grid, sources=[grid.start], goals=[grid.goal])
+        if algorithm in ('dijkstra', 'terrain_astar'):
+            if self.terrain is None:
+                self.terrain = Terrain(self.grid, self.connectivity)
+            return ALGORITHMS[algorithm](grid, terrain=self.terrain)
+        return ALGORITHMS[algorithm](grid)
+
+
+def read_queries(filename):
+    '''
+    Yields the ((row, col), (row, col)) start and goal pairs of a query file, one "row col row col" line
+    per query, separated by spaces or commas, with blank lines and '#' comments skipped
+    '''
+    with open(filename) as f:
+        for line in f:
+            line = line.split('#', 1)[0].replace(',', ' ').split()
+            if not line:
+                continue
+            if len(line) != 4:
+                raise ValueError("Expected 'row col row col', got: " + ' '.join(line))
+            start_row, start_col, goal_row, goal_col = map(int, line)
+            yield (start_row, start_col), (goal_row, goal_col)
+
+
+def throughput(queries, elapsed):
+    '''
+    Returns a report of the number of queries answered in elapsed seconds and their rate
+    '''
+    rate = queries / elapsed if elapsed > 0 else float('inf')
+    return "%d queries in %.3fs (%.1f queries/sec)" % (queries, elapsed, rate)
+
+
+def read_waypoints(filename):
+    '''
+    Yields the (row, col) of the waypoints of a file in order, one "row col" line per waypoint, separated by
+    spaces or commas, with blank lines and '#' comments skipped
+    '''
+    with open(filename) as f:
+        for line in f:
+            line = line.split('#', 1)[0].replace(',', ' ').split()
+            if not line:
+                continue
+            if len(line) != 2:
+                raise ValueError("Expected 'row col', got: " + ' '.join(line))
+            yield int(line[0]), int(line[1])
+
+
+class WaypointPlanner:
+    '''
+    Plans routes through ordered waypoints on one grid, one A* search per leg, reusing between the legs:
+    - Labels (the connected component of every cell, so that a leg between components fails at once)
+    - Cost, Parent and Closed (the A* buffers, whose entries are stamped with the leg that wrote them
+      instead of being cleared or allocated again for every leg)
+    '''
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.labels = component_labels(grid)
+        self.cost = array('i', bytes(4 * grid.size))
+        self.parent = array('i', bytes(4 * grid.size))
+        self.seen = array('i', bytes(4 * grid.size))
+        self.closed = array('i', bytes(4 * grid.size))
+        self.leg = 0
+
+    def search(self, start, goal):
+        '''
+        Returns the (path, cost, nodes expanded, max nodes stored, max search depth) of an A* search from the
+        start cell to the goal cell, the path being [] and the cost -1 without a solution
+        '''
+        self.leg += 1
+        leg = self.leg
+        labels = self.labels
+        if labels[start] == 0 or labels[start] != labels[goal]:
+            return [], -1, 0, 0, 0
+
+        cost, parent, seen, closed = self.cost, self.parent, self.seen, self.closed
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        heuristic = manhattan(self.grid, goal)
+
+        max_nodes_stored = 1
+        max_search_depth = 0
+        nodes_expanded = 0
+        explored_count = 0
+
+        # A cell's cost and parent are only valid if it was seen during this leg
+        cost[start] = 0
+        parent[start] = -1
+        seen[start] = leg
+        frontier = [(heuristic(start), 0, start)]
+        while frontier:
+            _, _, cell = heapq.heappop(frontier)
+            if closed[cell] == leg:
+                continue
+            closed[cell] = leg
+            explored_count += 1
+
+            if cell == goal:
+                path = [cell]
+                while parent[path[-1]] != -1:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return path, cost[cell], nodes_expanded, max_nodes_stored, max_search_depth
+
+            nodes_expanded += 1
+            new_cost = cost[cell] + 1
+            for offset in offsets:
+                neighbor = cell + offset
+                if passable[neighbor] and (seen[neighbor] != leg or new_cost < cost[neighbor]):
+                    seen[neighbor] = leg
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = cell
+                    heapq.heappush(frontier, (new_cost + heuristic(neighbor), new_cost, neighbor))
+                    if new_cost > max_search_depth:
+                        max_search_depth = new_cost
+
+            max_nodes_stored = max(max_nodes_stored, len(frontier) + explored_count)
+        return [], -1, nodes_expanded, max_nodes_stored, max_search_depth
+
+    def legs(self, waypoints):
+        '''
+        Yields the (start, goal, path, cost, nodes expanded, max nodes stored, max search depth, time) of
+        every leg between consecutive (row, col) waypoints, as soon as it is planned
+        '''
+        grid = self.grid
+        for row, col in waypoints:
+            if not grid.in_bounds(row, col):
+                raise ValueError("(%d, %d) is outside the %dx%d arena" % (row, col, grid.rows, grid.cols))
+        for start, goal in zip(waypoints, waypoints[1:]):
+            begin_time = time.time()
+            leg = self.search(grid.index(*start), grid.index(*goal))
+            yield (start, goal) + leg + (time.time() - begin_time,)
+
+
+'''
+This function plans a route through ordered waypoints on the input arena (which is a list of str)
+Returns the same tuple as astar for the whole route, whose cost is the sum of the costs of its legs
+The arena is compiled once into a Grid and the legs are planned by a WaypointPlanner in waypoints_grid
+'''
+
+
+def waypoints(arena, stops):
+    return waypoints_grid(Grid(arena), stops)
+
+
+@measure_memory
+def waypoints_grid(grid, stops, planner=None, stats=None):
+    '''
+    The stops are (row, col) positions, visited in order after the start of the grid if it has one. Nodes
+    expanded are summed over the legs, max nodes stored and max search depth are those of the largest leg.
+    The number of legs is stored in stats as 'legs'. The route fails (cost -1) as soon as one leg does.
+    '''
+    begin_time = time.time()
+    if planner is None:
+        planner = WaypointPlanner(grid)
+    stops = list(stops)
+    if grid.start != -1:
+        stops.insert(0, grid.position(grid.start))
+
+    route = []
+    route_cost = nodes_expanded = max_nodes_stored = max_search_depth = 0
+    if stats is not None:
+        stats['legs'] = max(len(stops) - 1, 0)
+    for _, _, path, cost, expanded, stored, depth, _ in planner.legs(stops):
+        nodes_expanded += expanded
+        max_nodes_stored = max(max_nodes_stored, stored)
+        max_search_depth = max(max_search_depth, depth)
+        if cost == -1:
+            return SolvedArena(grid, []), -1, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+        route.extend(path[1:] if route else path)
+        route_cost += cost
+    if not route:
+        return SolvedArena(grid, []), -1, 0, 0, 0, time.time() - begin_time, 0
+    return render_path(grid, route), route_cost, nodes_expanded, max_nodes_stored, max_search_depth, time.time() - begin_time, 0
+
+
+class Reservations:
+    '''
+    The space-time cells claimed by the agents planned so far, for prioritized multi-agent planning:
+    - Cells (set of the (cell, time) that an agent occupies)
+    - Moves (set of the (cell, next cell, time) moves, so that two agents never swap cells along an edge)
+    - Parked (the time from which an agent that reached its goal stays there, by cell)
+    - Last (the last time at which a moving agent occupies each cell, and the last such time over all cells,
+      after which the arena no longer changes)
+    '''
+
+    def __init__(self):
+        self.cells = set()
+        self.moves = set()
+        self.parked = {}
+        self.last = {}
+        self.horizon = -1
+
+    def reserve(self, path):
+        '''
+        Claims the path of an agent, one cell per time step from time 0, the agent then staying at its last cell
+        '''
+        for step, cell in enumerate(path):
+            self.cells.add((cell, step))
+            self.last[cell] = max(self.last.get(cell, -1), step)
+        for step in range(len(path) - 1):
+            self.moves.add((path[step], path[step + 1], step))
+        self.parked[path[-1]] = len(path) - 1
+        self.horizon = max(self.horizon, len(path) - 1)
+
+    def is_free(self, cell, step):
+        parked = self.parked.get(cell)
+        return (cell, step) not in self.cells and (parked is None or step < parked)
+
+    def can_move(self, cell, neighbor, step):
+        '''
+        Returns whether an agent may move from cell at step to neighbor (or wait, when it is the cell) at step + 1
+        '''
+        return self.is_free(neighbor, step + 1) and (neighbor, cell, step) not in self.moves
+
+    def can_stop(self, cell, step):
+        '''
+        Returns whether an agent may stay at cell for good from step on
+        '''
+        return step > self.last.get(cell, -1) and cell not in self.parked
+
+
+def space_time_astar(grid, start, goal, reservations):
+    '''
+    Returns the path (one cell per time step, waits repeating a cell) of an agent from the start cell to the
+    goal cell avoiding the reservations, and the number of nodes expanded. The path is None if there is none.
+    States are (cell, time), with waiting as a fifth move, and the heuristic is the exact distance to the goal
+    ignoring the other agents. Past the reservation horizon the arena is static, so states from then on are
+    closed by cell alone, which bounds the search even when the goal can never be reached.
+    '''
+    distance = distance_field(grid, goal)
+    if start == -1 or distance[start] == -1 or not reservations.is_free(start, 0):
+        return None, 0
+
+    moves = (0,) + grid.offsets
+    passable = grid.passable
+    horizon = reservations.horizon + 1
+    parent = {(start, 0): None}
+    closed = set()
+    nodes_expanded = 0
+    frontier = [(distance[start], 0, start)]
+    while frontier:
+        _, step, cell = heapq.heappop(frontier)
+        key = (cell, min(step, horizon))
+        if key in closed:
+            continue
+        closed.add(key)
+
+        if cell == goal and reservations.can_stop(cell, step):
+            path = [cell]
+            state = (cell, step)
+            while parent[state] is not None:
+                state = parent[state]
+                path.append(state[0])
+            path.reverse()
+            return path, nodes_expanded
+
+        nodes_expanded += 1
+        for offset in moves:
+            neighbor = cell + offset
+            if not passable[neighbor] or distance[neighbor] == -1 or not reservations.can_move(cell, neighbor, step):
+                continue
+            if (neighbor, min(step + 1, horizon)) in closed or (neighbor, step + 1) in parent:
+                continue
+            parent[(neighbor, step + 1)] = (cell, step)
+            heapq.heappush(frontier, (step + 1 + distance[neighbor], step + 1, neighbor))
+    return None, nodes_expanded
+
+
+def plan_agents(grid, agents, reservations=None):
+    '''
+    Prioritized planning: yields the (start, goal, path, nodes expanded, time) of every ((row, col), (row, col))
+    agent in priority order, each one planned with space_time_astar around the agents before it and then
+    reserving its own path. The path is None for an agent that cannot reach its goal, and then reserves its start.
+    '''
+    if reservations is None:
+        reservations = Reservations()
+    for start, goal in agents:
+        begin_time = time.time()
+        for row, col in (start, goal):
+            if not grid.in_bounds(row, col):
+                raise ValueError("(%d, %d) is outside the %dx%d arena" % (row, col, grid.rows, grid.cols))
+        start_cell = grid.index(*start)
+        path, nodes_expanded = space_time_astar(grid, start_cell, grid.index(*goal), reservations)
+        if path is not None:
+            reservations.reserve(path)
+        elif reservations.is_free(start_cell, 0):
+            reservations.reserve([start_cell])
+        yield start, goal, path, nodes_expanded, time.time() - begin_time
+
+
+class DStarLite:
+    '''
+    An incremental planner (D* Lite) that keeps its search between plans and repairs it when the arena changes:
+    - Grid (its own copy of the grid, whose mask and arena block and unblock edit, and whose start moves)
+    - G and Rhs (the distance of every cell to the goal, and its one step lookahead through the neighbors)
+    - Queue (the inconsistent cells, a heap of (key, cell) whose stale entries are skipped when popped)
+    - Km (the heuristic offset accumulated by start moves, so that the keys already queued stay valid)
+    The search runs backwards from the goal, so distances found before a move or a change are kept and only
+    the cells they affect are expanded again. Moves are the URDL moves of MazeState and the heuristic the
+    Manhattan distance to the start.
+    '''
+
+    INFINITY = (1 << 31) - 1
+
+    def __init__(self, grid):
+        if grid.start == -1 or grid.goal == -1:
+            raise ValueError("The arena needs a start and a goal")
+        self.grid = copy.copy(grid)
+        self.grid.passable = bytearray(grid.passable)
+        self.grid.arena = list(grid.arena)
+        self.grid._digest = None
+
+        self.g = array('i', [self.INFINITY]) * grid.size
+        self.rhs = array('i', [self.INFINITY]) * grid.size
+        self.queue = []
+        self.queued = {}
+        self.km = 0
+        self.last = grid.start
+        self.touched = 0
+
+        self.rhs[grid.goal] = 0
+        self.push(grid.goal)
+
+    def distance(self, cell, other):
+        row, col = divmod(cell, self.grid.width)
+        other_row, other_col = divmod(other, self.grid.width)
+        return abs(row - other_row) + abs(col - other_col)
+
+    def key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return best + self.distance(self.grid.start, cell) + self.km, best
+
+    def push(self, cell):
+        key = self.queued[cell] = self.key(cell)
+        heapq.heappush(self.queue, key + (cell,))
+
+    def update(self, cell):
+        '''
+        Recomputes the lookahead of a cell and queues it if it is inconsistent
+        '''
+        g, passable = self.g, self.grid.passable
+        if cell != self.grid.goal:
+            best = self.INFINITY
+            if passable[cell]:
+                for offset in self.grid.offsets:
+                    neighbor = cell + offset
+                    if passable[neighbor] and g[neighbor] + 1 < best:
+                        best = g[neighbor] + 1
+            self.rhs[cell] = best
+        if g[cell] != self.rhs[cell]:
+            self.push(cell)
+        else:
+            self.queued.pop(cell, None)
+
+    def compute(self):
+        '''
+        Expands inconsistent cells until the start is consistent and no queued key is lower than its own
+        '''
+        g, rhs, queue, queued = self.g, self.rhs, self.queue, self.queued
+        start = self.grid.start
+        offsets = self.grid.offsets
+        while queue:
+            k1, k2, cell = queue[0]
+            if queued.get(cell) != (k1, k2):
+                heapq.heappop(queue)  # Stale entry
+                continue
+            if (k1, k2) >= self.key(start) and rhs[start] == g[start]:
+                break
+
+            heapq.heappop(queue)
+            self.touched += 1
+            if (k1, k2) < self.key(cell):
+                # Queued before a start move, its key only grew
+                self.push(cell)
+            elif g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+                del queued[cell]
+                for offset in offsets:
+                    self.update(cell + offset)
+            else:
+                g[cell] = self.INFINITY
+                self.update(cell)
+                for offset in offsets:
+                    self.update(cell + offset)
+
+    def set_cell(self, row, col, passable):
+        '''
+        Blocks (passable False) or unblocks the cell at (row, col) and queues the cells whose distance it may change
+        '''
+        grid = self.grid
+        if not grid.in_bounds(row, col):
+            raise ValueError("(%d, %d) is outside the %dx%d arena" % (row, col, grid.rows, grid.cols))
+        cell = grid.index(row, col)
+        if not passable and cell in (grid.start, grid.goal):
+            raise ValueError("The start and the goal cannot be blocked")
+        if grid.passable[cell] == passable:
+            return
+
+        grid.passable[cell] = passable
+        # Cells past the end of a short row are walls
+        line = grid.arena[row].ljust(col + 1, 'o')
+        grid.arena[row] = line[:col] + (' ' if passable else 'o') + line[col + 1:]
+        self.update(cell)
+        for offset in grid.offsets:
+            self.update(cell + offset)
+
+    def block(self, row, col):
+        self.set_cell(row, col, 0)
+
+    def unblock(self, row, col):
+        self.set_cell(row, col, 1)
+
+    def move(self, row, col):
+        '''
+        Moves the start to (row, col), as the robot drives along the path
+        '''
+        grid = self.grid
+        if not grid.in_bounds(row, col) or not grid.passable[grid.index(row, col)]:
+            raise ValueError("(%d, %d) is not an open cell of the arena" % (row, col))
+        start = grid.index(row, col)
+        self.km += self.distance(self.last, start)
+        self.last = grid.start = start
+
+    def path(self):
+        '''
+        Returns the cells of a shortest path from the start to the goal, each step going to the neighbor
+        closest to the goal (first in URDL order), or [] if the goal cannot be reached
+        '''
+        g, passable = self.g, self.grid.passable
+        cell, goal = self.grid.start, self.grid.goal
+        if g[cell] == self.INFINITY:
+            return []
+        path = [cell]
+        while cell != goal:
+            cell = min((cell + offset for offset in self.grid.offsets if passable[cell + offset]), key=g.__getitem__)
+            path.append(cell)
+        return path
+
+    @measure_memory
+    def plan(self, stats=None):
+        '''
+        Repairs the search after the changes and moves made since the last plan, and returns the same tuple
+        as astar, the nodes expanded being the cells this plan touched (expanded again). If stats is a
+        dict, the number of cells a full A* run from the start expands on the current arena is stored in
+        it as 'astar_expanded'.
+        '''
+        begin_time = time.time()
+        self.touched = 0
+        self.compute()
+        path = self.path()
+        search_time = time.time() - begin_time
+
+        if stats is not None:
+            stats['astar_expanded'] = astar_grid(self.grid)[2]
+
+        # Rendered from a copy of the grid as it is now, as it changes with the next blocks and unblocks
+        grid = copy.copy(self.grid)
+        grid.passable = bytearray(self.grid.passable)
+        grid.arena = list(self.grid.arena)
+        if not path:
+            return SolvedArena(grid, []), -1, self.touched, len(self.queued), 0, search_time, 0
+        return (render_path(grid, path), len(path) - 1, self.touched, len(self.queued), len(path) - 1,
+                search_time, 0)
+
+
+def read_updates(filename):
+    '''
+    Yields the (command, row, col) changes of an update file, one "block row col", "unblock row col" or
+    "start row col" line per change, with blank lines and '#' comments skipped
+    '''
+    with open(filename) as f:
+        for line in f:
+            line = line.split('#', 1)[0].replace(',', ' ').split()
+            if not line:
+                continue
+            if len(line) != 3 or line[0] not in ('block', 'unblock', 'start'):
+                raise ValueError("Expected 'block|unblock|start row col', got: " + ' '.join(line))
+            yield line[0], int(line[1]), int(line[2])
+
+
+def solution_record(algorithm, result, stats=None, render=False):
+    '''
+    Returns the 7-tuple result of a search as a dict for JSON output: its statistics, the start and the
+    run-length moves of its path (None without a solution, see SolvedArena.moves), the number values of
+    its stats, and the rendered solved arena only if render is set, as it costs the area of the arena
+    '''
+    solved_arena, cost, nodes_expanded, max_nodes_stored, max_search_depth, search_time, ram = result
+    record = {
+        'algorithm': algorithm,
+        'cost': cost,
+        'nodes_expanded': nodes_expanded,
+        'max_nodes_stored': max_nodes_stored,
+        'max_search_depth': max_search_depth,
+        'time': search_time,
+        'ram': ram,
+        'start': None,
+        'moves': None,
+    }
+    if solved_arena.path:
+        record['start'] = list(solved_arena.positions()[0])
+        record['moves'] = solved_arena.moves()
+    for key, value in (stats or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            record[key] = value
+    if render:
+        record['arena'] = list(solved_arena)
+    return record
+
+
+def read_arena(filename):
+    '''
+    Returns the arena of a map file as a list of str
+    '''
+    with open(filename) as f:
+        return f.read().split("\n")
+
+
+def load_grid(filename, cache=None):
+    '''
+    Returns the compiled grid of a map file without reading it into a list of str first. The file is
+    memory mapped, the row boundaries are found with find on the buffer and each row is translated to
+    passability straight into the mask. The arena itself is only decoded from the buffer if something
+    renders it. Rows are the same as read_arena's: split on "\n", a trailing newline giving a last empty
+    row, and short rows padded with walls. Files with "\r" or non-ASCII bytes, which text mode would
+    translate, go through read_arena instead. Binary grid files (see write_grid) are recognised by their
+    magic and read with read_grid. With a cache directory, text maps are compiled once and then read from
+    the binary grid cached under the hash of their content.
+    '''
+    import bisect
+    import mmap
+
+    with open(filename, 'rb') as f:
+        if f.read(len(GRID_MAGIC)) == GRID_MAGIC:
+            return read_grid(filename)
+    if cache is not None:
+        return cached_grid(filename, cache)
+
+    with open(filename, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            data = b''
+    if data.find(b'\r') != -1:
+        return Grid(read_arena(filename))
+
+    starts, ends = [0], []
+    end = data.find(b'\n')
+    while end != -1:
+        ends.append(end)
+        starts.append(end + 1)
+        end = data.find(b'\n', end + 1)
+    ends.append(len(data))
+
+    grid = Grid.__new__(Grid)
+    grid.set_size(len(starts), max(end - start for start, end in zip(starts, ends)))
+    grid.passable = bytearray(grid.size)
+    for row, (start, end) in enumerate(zip(starts, ends)):
+        line = data[start:end]
+        if not line.isascii():
+            return Grid(read_arena(filename))
+        base = grid.index(row, 0)
+        grid.passable[base:base + end - start] = line.translate(Grid._PASSABLE)
+
+    def cell(offset):
+        # The first mark in the file is in the first row that has one, at its first column
+        if offset == -1:
+            return -1
+        row = bisect.bisect_right(starts, offset) - 1
+        return grid.index(row, offset - starts[row])
+
+    grid.start, grid.goal = cell(data.find(b's')), cell(data.find(b'g'))
+
+    def arena(top=0, bottom=None, left=0, right=None):
+        # Only the bytes of the window are decoded
+        return [data[min(start + left, end):end if right is None else min(start + right, end)].decode('ascii')
+                for start, end in zip(starts[top:bottom], ends[top:bottom])]
+
+    grid.arena = arena
+    return grid
+
+
+# Binary grid files: a little-endian header (magic, rows, cols, start and goal cell indices, -1 if missing)
+# followed by the obstacle plane of the bordered grid, one bit per cell with 1 for a wall, most significant
+# bit first and zero padded to a whole byte, then the terrain: b'U' when every passable cell weighs 1, or
+# b'W' and the weights plane of the bordered grid, one byte per cell. Files written before the terrain was
+# stored end after the obstacle plane, and their grids cannot be searched by the weighted searches.
+GRID_MAGIC = b'\x89MZG'
+GRID_HEADER = '<4sIIqq'
+
+# Bit k (0 the most significant) of a plane byte to a mask byte, and a mask byte to bit k of a plane byte
+_PLANE_MASK = [bytes(0 if b >> (7 - k) & 1 else 1 for b in range(256)) for k in range(8)]
+_MASK_PLANE = [bytes.maketrans(b'\x00\x01', bytes((1 << (7 - k), 0))) for k in range(8)]
+
+
+def write_grid(grid, filename):
+    '''
+    Writes a compiled grid to a binary grid file. Cells k, k + 8, k + 16... of the mask become bit k of
+    the plane bytes, one strided slice and translate per bit rather than a loop over cells.
+    '''
+    import struct
+
+    mask = grid.passable[:]
+    mask += bytes(-len(mask) % 8)
+    plane = 0
+    for k in range(8):
+        plane |= int.from_bytes(mask[k::8].translate(_MASK_PLANE[k]), 'big')
+    weights = Terrain.grid_weights(grid)
+    with open(filename, 'wb') as f:
+        f.write(struct.pack(GRID_HEADER, GRID_MAGIC, grid.rows, grid.cols, grid.start, grid.goal))
+        f.write(plane.to_bytes(len(mask) // 8, 'big'))
+        # Unit weights are the passability mask itself
+        if weights is None:
+            pass
+        elif weights == grid.passable:
+            f.write(b'U')
+        else:
+            f.write(b'W')
+            f.write(weights)
+
+
+def read_grid(filename):
+    '''
+    Returns the grid of a binary grid file, unpacking the plane with one translate and strided slice
+    assignment per bit. Its arena is rebuilt from the mask, so padding at the end of short rows shows as
+    walls and characters other than 'o', 's' and 'g' as blanks. The weights of the terrain come from the
+    file instead of the arena.
+    '''
+    import struct
+
+    with open(filename, 'rb') as f:
+        header = f.read(struct.calcsize(GRID_HEADER))
+        plane = f.read()
+    magic, rows, cols, start, goal = struct.unpack(GRID_HEADER, header)
+    if magic != GRID_MAGIC:
+        raise ValueError(filename + " is not a binary grid file")
+
+    size = (rows + 2) * (cols + 2)
+    plane, terrain = plane[:(size + 7) // 8], plane[(size + 7) // 8:]
+    if len(plane) != (size + 7) // 8 or terrain not in (b'', b'U') and len(terrain) != size + 1:
+        raise ValueError(filename + " is truncated")
+    passable = bytearray(len(plane) * 8)
+    for k in range(8):
+        passable[k::8] = plane.translate(_PLANE_MASK[k])
+    del passable[size:]
+    weights = None if not terrain else passable if terrain == b'U' else terrain[1:]
+    return Grid.from_mask(passable, rows, cols, start, goal, weights=weights)
+
+
+def cached_grid(filename, directory):
+    '''
+    Returns the grid of a text map through a cache directory of binary grid files named after the
+    SHA-256 of the map, compiling and adding the map on a miss
+    '''
+    import hashlib
+    import os
+
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(functools.partial(f.read, 1 << 20), b''):
+            digest.update(chunk)
+    path = os.path.join(directory, digest.hexdigest() + '.grid')
+    if os.path.exists(path):
+        return read_grid(path)
+
+    grid = load_grid(filename)
+    os.makedirs(directory, exist_ok=True)
+    # Written aside and renamed so that a concurrent run never reads half a file
+    temporary = '%s.%d' % (path, os.getpid())
+    write_grid(grid, temporary)
+    os.replace(temporary, path)
+    return grid
+
+
+# Grid of the map the jobs of this process currently run on, and its HPA* abstract graph, see run_job
+_job_grids = {}
+_job_graphs = {}
+
+
+def run_job(job):
+    '''
+    Runs one (map, algorithm) job of run_jobs and returns its result line. The compiled grid is
+    memory mapped from the file written by run_jobs and kept for the next jobs of the same map, as is its
+    HPA* abstract graph, whose build time ends the line of HPA* jobs.
+    '''
+    import mmap
+
+    global MEMORY_TRACKING
+    MEMORY_TRACKING = False
+    path, rows, cols, start, goal, filename, algorithm, cluster_size, connectivity = job
+    grid = _job_grids.get(path)
+    if grid is None:
+        # The jobs of a map are consecutive, so only the current map is kept
+        _job_grids.clear()
+        _job_graphs.clear()
+        with open(path, 'rb') as f:
+            passable = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        weights = None
+        if os.path.exists(path + '.weights'):
+            with open(path + '.weights', 'rb') as f:
+                weights = f.read()
+        grid = _job_grids[path] = Grid.from_mask(passable, rows, cols, start, goal, weights=weights)
+
+    if algorithm != 'hpa':
+        options = {'connectivity': connectivity} if algorithm in ('dijkstra', 'terrain_astar') else {}
+        _, cost, nodes_expanded, max_nodes_stored, max_search_depth, search_time, _ = ALGORITHMS[algorithm](
+            grid, **options)
+        return "%s %s %s %d %d %d %.6f" % (filename, algorithm, cost, nodes_expanded, max_nodes_stored,
+                                           max_search_depth, search_time)
+
+    # The abstract graph is built once per map and its time is a column of its own
+    try:
+        import numpy  # Imported before the graph is built so that it is not in its time
+    except ImportError:
+        pass
+    graph_time = time.time()
+    if path not in _job_graphs:
+        _job_graphs[path] = AbstractGraph(grid, cluster_size)
+    graph_time = time.time() - graph_time
+    _, cost, nodes_expanded, max_nodes_stored, max_search_depth, search_time, _ = hpa_grid(grid, _job_graphs[path])
+    return "%s %s %s %d %d %d %.6f %.6f" % (filename, algorithm, cost, nodes_expanded, max_nodes_stored,
+                                            max_search_depth, search_time, graph_time)
+
+
+def run_jobs(maps, algorithms, workers=1, cache=None, cluster_size=10, connectivity=4):
+    '''
+    Yields the result line of every (map, algorithm) job, maps first then algorithms, in that order whatever
+    the number of workers. Each map is read (through the cache directory if any) and compiled once, its
+    passability mask is written to a temporary file that the worker processes memory map instead of
+    receiving a pickled grid per job. The weights of the terrain are written next to it for the weighted searches.
+    '''
+    import multiprocessing
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        def jobs():
+            for index, filename in enumerate(maps):
+                grid = load_grid(filename, cache)
+                path = os.path.join(directory, '%d.grid' % index)
+                with open(path, 'wb') as f:
+                    f.write(grid.passable)
+                if 'dijkstra' in algorithms or 'terrain_astar' in algorithms:
+                    weights = Terrain.grid_weights(grid)
+                    if weights is not None:
+                        with open(path + '.weights', 'wb') as f:
+                            f.write(weights)
+                for algorithm in algorithms:
+                    yield (path, grid.rows, grid.cols, grid.start, grid.goal, filename, algorithm, cluster_size,
+                           connectivity)
+
+        if workers <= 1:
+            yield from map(run_job, jobs())
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                yield from pool.imap(run_job, jobs())
 
 
 if __name__ == "__main__":
+    # Only single runs print the RAM usage, the other modes are timed without tracemalloc
+    MEMORY_TRACKING = not (results.no_memory or isinstance(results.m, list) or results.replan or results.batch
+                           or results.waypoints or results.agents)
+
+    # Written when the run ends, whichever mode it ran in
+    import atexit
+
+    if results.profile:
+        PROFILER = Profiler()
+
+        def dump_profile():
+            PROFILER.dump(results.profile)
+            if results.format == 'text':
+                print("\n".join(["Profile:"] + PROFILER.report()))
+        atexit.register(dump_profile)
+    if results.cprofile:
+        import cProfile
+
+        cprofiler = cProfile.Profile()
+        atexit.register(cprofiler.dump_stats, results.cprofile)
+        atexit.register(cprofiler.disable)
+        cprofiler.enable()
+
+    if isinstance(results.m, list):
+        # Several maps, run_jobs reads and compiles each of them once
+        algorithms = [name for name in ALGORITHMS if getattr(results, name)]
+        for line in run_jobs(results.m, algorithms, results.workers or 1, results.cache, results.cluster_size,
+                             results.connectivity):
+            print(line, flush=True)
+        exit()
+
+    # Reading of map given and all other initializations, compiled once and shared by every algorithm below
+    try:
+        grid = load_grid(results.m, results.cache)
+    except:
+        print("Error in reading the arena file.")
+        exit()
+
+    if results.convert:
+        write_grid(grid, results.convert)
+        print("Wrote " + results.convert)
+        exit()
+
+    if results.echo:
+        # Internal representation
+        print(grid.arena)
+
+    if results.format == 'text':
+        print("The arena of size " + str(grid.rows) + "x" + str(grid.cols))
+    if results.echo:
+        print("\n".join(grid.arena))
+
+    if results.replan:
+        # One line per plan: the change, then the cost, cells touched by the replan and cells a full A* expands
+        updates = [('plan', 0, 0)] + list(read_updates(results.replan))
+        if grid.start == -1 or grid.goal == -1:
+            # No path to plan, like the other modes without a start or a goal
+            for command, row, col in updates:
+                print("%s %d %d -1 0 0 %.6f" % (command, row, col, 0.0))
+            exit()
+        planner = DStarLite(grid)
+        for update in updates:
+            command, row, col = update
+            if command == 'block':
+                planner.block(row, col)
+            elif command == 'unblock':
+                planner.unblock(row, col)
+            elif command == 'start':
+                planner.move(row, col)
+            replan_stats = {}
+            replan_arena, replan_cost, replan_touched, _, _, replan_time, _ = planner.plan(stats=replan_stats)
+            if results.echo:
+                print("\n".join(replan_arena))
+            print("%s %d %d %d %d %d %.6f" % (command, row, col, replan_cost, replan_touched,
+                                              replan_stats['astar_expanded'], replan_time), flush=True)
+        exit()
+
+    if results.batch:
+        # One line per query and algorithm, printed as soon as it is answered
+        batch_time = time.time()
+        solver = BatchSolver(grid, landmarks=results.landmarks, exact=results.exact, cluster_size=results.cluster_size,
+                             connectivity=results.connectivity)
+        algorithms = [name for name in ALGORITHMS if getattr(results, name)] or ['astar']
+        queries = 0
+        for start, goal in read_queries(results.batch):
+            for algorithm in algorithms:
+                _, cost, nodes_expanded, _, _, search_time, _ = solver.solve(start, goal, algorithm)
+                print("%d %d %d %d %s %s %d %.6f" % (start + goal + (algorithm, cost, nodes_expanded, search_time)),
+                      flush=True)
+                queries += 1
+        if results.exact:
+            print("Heuristic Cache: " + HEURISTIC_CACHE.report(), file=sys.stderr)
+        if solver.graph is not None:
+            print("Graph Build Time: " + str(solver.graph_time) + "s", file=sys.stderr)
+        print("Throughput: " + throughput(queries, time.time() - batch_time), file=sys.stderr)
+        exit()
+
+    if results.waypoints:
+        # One line per leg, then the route, the legs sharing the buffers of one planner
+        route_time = time.time()
+        stops = list(read_waypoints(results.waypoints))
+        if grid.start != -1:
+            stops.insert(0, grid.position(grid.start))
+        route = []
+        route_cost = legs = 0
+        for start, goal, path, cost, nodes_expanded, _, _, search_time in WaypointPlanner(grid).legs(stops):
+            print("%d %d %d %d %d %d %.6f" % (start + goal + (cost, nodes_expanded, search_time)), flush=True)
+            legs += 1
+            if route_cost != -1:
+                route_cost = -1 if cost == -1 else route_cost + cost
+                route.extend(path[1:] if route else path)
+        if results.echo and route_cost != -1 and route:
+            print("\n".join(render_path(grid, route)))
+        print("route %d" % route_cost)
+        print("Throughput: " + throughput(legs, time.time() - route_time), file=sys.stderr)
+        exit()
+
+    if results.agents:
+        # One line per agent in priority order: its start and goal, arrival time (-1 if it has no path), waits and nodes expanded
+        agents_time = time.time()
+        planned = failed = makespan = 0
+        paths = []
+        for start, goal, path, nodes_expanded, search_time in plan_agents(grid, list(read_queries(results.agents))):
+            if path is None:
+                failed += 1
+                print("%d %d %d %d -1 0 %d %.6f" % (start + goal + (nodes_expanded, search_time)), flush=True)
+                continue
+            planned += 1
+            paths.append(path)
+            arrival = len(path) - 1
+            makespan = max(makespan, arrival)
+            waits = sum(1 for cell, next_cell in zip(path, path[1:]) if cell == next_cell)
+            print("%d %d %d %d %d %d %d %.6f" % (start + goal + (arrival, waits, nodes_expanded, search_time)),
+                  flush=True)
+        if results.echo:
+            for path in paths:
+                print("\n".join(render_path(grid, path)) + "\n")
+        print("agents %d planned %d failed makespan %d" % (planned, failed, makespan))
+        print("Throughput: " + throughput(planned + failed, time.time() - agents_time), file=sys.stderr)
+        exit()
+
+    # The grid each algorithm searches, the pruned one for the PRUNED_SEARCHES with -prune
+    search_grid = {name: grid for name in ALGORITHMS}
+    prune_stats = None
+    if results.prune and any(getattr(results, name) for name in PRUNED_SEARCHES):
+        prune_stats = {}
+        prune_time = time.time()
+        pruned = prune_grid(grid, stats=prune_stats)
+        prune_stats['prune_time'] = time.time() - prune_time
+        search_grid.update((name, pruned) for name in PRUNED_SEARCHES)
+        if results.format == 'text':
+            print("Pruned %d of %d open cells (%.1f%%)%s in %.6fs"
+                  % (prune_stats['pruned_cells'], prune_stats['open_cells'], prune_stats['pruned_percent'],
+                     "" if prune_stats['reachable'] else ", the goal is unreachable,", prune_stats['prune_time']))
+
+    # Keyword arguments of each algorithm from the command line
+    search_options = {name: {} for name in ALGORITHMS}
+    search_options['astar']['open_list'] = OPEN_LISTS[results.open_list]
+    search_options['ida']['in_path'] = results.ida_cycle_check
+    search_options['ida']['table_size'] = IDA_TABLE_SIZE if results.ida_table is None else results.ida_table
+    search_options['ara']['weight'] = results.weight
+    search_options['ara']['deadline'] = results.deadline / 1000 if results.deadline is not None else None
+    search_options['ara']['node_budget'] = results.node_budget
+    if results.exact and (results.astar or results.ida):
+        search_options['astar']['heuristic'] = search_options['ida']['heuristic'] = exact_heuristic(search_grid['astar'], grid.goal)
+    if results.dijkstra or results.terrain_astar:
+        try:
+            terrain = Terrain(grid, results.connectivity)
+        except ValueError as error:
+            print(error)
+            exit()
+        search_options['dijkstra']['terrain'] = search_options['terrain_astar']['terrain'] = terrain
+    if results.hpa:
+        try:
+            import numpy  # Imported before the graph is built so that it is not in its time
+        except ImportError:
+            pass
+        graph_time = time.time()
+        hpa_graph_loaded = bool(results.hpa_graph) and os.path.exists(results.hpa_graph)
+        if hpa_graph_loaded:
+            hpa_graph = AbstractGraph.load(grid, results.hpa_graph)
+        else:
+            hpa_graph = AbstractGraph(grid, results.cluster_size)
+            if results.hpa_graph:
+                hpa_graph.save(results.hpa_graph)
+        graph_time = time.time() - graph_time
+        search_options['hpa']['graph'] = hpa_graph
+
+    # The solved arenas, kept for --overlay, and the part of them rendered
+    overlay_results = []
+
+    def overlay_window(solved):
+        '''
+        Returns the (top, left, height, width) of the --window, or of the --crop around all the solved paths
+        '''
+        if results.window:
+            return tuple(results.window)
+        boxes = [solved_arena.bounds() for _, _, solved_arena in solved if solved_arena.path]
+        if results.crop is None or not boxes:
+            return 0, 0, None, None
+        top = max(0, min(box[0] for box in boxes) - results.crop)
+        left = max(0, min(box[1] for box in boxes) - results.crop)
+        return (top, left, max(box[2] for box in boxes) + results.crop + 1 - top,
+                max(box[3] for box in boxes) + results.crop + 1 - left)
+
+    def show(name, solved_arena, cost):
+        '''
+        Prints a solved arena, or only its --window or --crop, unless it goes to the --overlay
+        '''
+        overlay_results.append((name, cost, solved_arena))
+        if results.overlay:
+            return
+        if results.window:
+            solved_arena = solved_arena.window(*results.window)
+        elif results.crop is not None:
+            solved_arena = solved_arena.crop(results.crop)
+        print("\n".join(solved_arena))
+
+    if results.format != 'text':
+        # Only the path moves are written unless --render, so the output grows with the path and not the arena
+        import json
+
+        if results.wave:
+            try:
+                import numpy  # Imported before the search so that it is not in its time and memory
+            except ImportError:
+                pass
+
+        records = []
+        for name in ALGORITHMS:
+            if not getattr(results, name):
+                continue
+            search_stats = {}
+            try:
+                result = measured_search(ALGORITHMS[name], search_grid[name], search_stats, **search_options[name])
+                if name == 'hpa':
+                    search_stats['graph_time'] = graph_time
+                record = solution_record(name, result, search_stats, results.render)
+                if name == 'hpa':
+                    # HPA* paths may be a few cells longer than the shortest ones
+                    record['optimal_cost'] = astar_grid(grid)[1]
+                    record['optimal'] = record['cost'] == record['optimal_cost']
+                overlay_results.append((name, result[1], result[0]))
+            except ImportError as error:
+                record = {'algorithm': name, 'error': str(error)}
+            if results.format == 'jsonl':
+                print(json.dumps(dict(record, map=results.m, **({'prune': prune_stats} if name in PRUNED_SEARCHES and prune_stats else {}))),
+                      flush=True)
+            else:
+                records.append(record)
+        if results.format == 'json':
+            document = {'map': results.m, 'rows': grid.rows, 'cols': grid.cols, 'results': records}
+            if prune_stats is not None:
+                document['prune'] = prune_stats
+            print(json.dumps(document))
+        if results.overlay:
+            write_overlay(grid, overlay_results, results.overlay, *overlay_window(overlay_results))
+        exit()
+
     if results.bfs:
         print("\nBFS algorithm called")
-        bfs_arena, bfs_cost, bfs_nodes_expanded, bfs_max_nodes_stored, bfs_max_search_depth, bfs_time, bfs_ram = bfs(
-            arena)
-        print("\n".join(bfs_arena))
+        bfs_stats = {}
+        bfs_arena, bfs_cost, bfs_nodes_expanded, bfs_max_nodes_stored, bfs_max_search_depth, bfs_time, bfs_ram = measured_search(
+            bfs_grid, search_grid['bfs'], stats=bfs_stats)
+        show('bfs', bfs_arena, bfs_cost)
         print("BFS:")
         print("Cost: " + str(bfs_cost))
         print("Nodes Expanded: " + str(bfs_nodes_expanded))
         print("Max Nodes Stored: " + str(bfs_max_nodes_stored))
         print("Max Search Depth: " + str(bfs_max_search_depth))
         print("Time: " + str(bfs_time) + "s")
+        if 'memory_net' in bfs_stats:
+            print("Net RAM Allocation: " + str(bfs_stats['memory_net']) + "kB")
         print("RAM Usage: " + str(bfs_ram) + "kB\n")
 
     if results.dfs:
         print("\nDFS algorithm called")
-        dfs_arena, dfs_cost, dfs_nodes_expanded, dfs_max_nodes_stored, dfs_max_search_depth, dfs_time, dfs_ram = dfs(
-            arena)
-        print("\n".join(dfs_arena))
+        dfs_stats = {}
+        dfs_arena, dfs_cost, dfs_nodes_expanded, dfs_max_nodes_stored, dfs_max_search_depth, dfs_time, dfs_ram = measured_search(
+            dfs_grid, search_grid['dfs'], stats=dfs_stats)
+        show('dfs', dfs_arena, dfs_cost)
         print("DFS:")
         print("Cost: " + str(dfs_cost))
         print("Nodes Expanded: " + str(dfs_nodes_expanded))
         print("Max Nodes Stored: " + str(dfs_max_nodes_stored))
         print("Max Search Depth: " + str(dfs_max_search_depth))
         print("Time: " + str(dfs_time) + "s")
+        if 'memory_net' in dfs_stats:
+            print("Net RAM Allocation: " + str(dfs_stats['memory_net']) + "kB")
         print("RAM Usage: " + str(dfs_ram) + "kB\n")
 
     if results.astar:
         print("\nA* algorithm called")
-        astar_arena, astar_cost, astar_nodes_expanded, astar_max_nodes_stored, astar_max_search_depth, astar_time, astar_ram = astar(
-            arena)
-        print("\n".join(astar_arena))
+        astar_stats = {}
+        astar_arena, astar_cost, astar_nodes_expanded, astar_max_nodes_stored, astar_max_search_depth, astar_time, astar_ram = measured_search(
+            astar_grid, search_grid['astar'], stats=astar_stats, **search_options['astar'])
+        show('astar', astar_arena, astar_cost)
         print("A*:")
         print("Cost: " + str(astar_cost))
         print("Nodes Expanded: " + str(astar_nodes_expanded))
         print("Max Nodes Stored: " + str(astar_max_nodes_stored))
         print("Max Search Depth: " + str(astar_max_search_depth))
+        if results.exact:
+            print("Heuristic Cache: " + HEURISTIC_CACHE.report())
         print("Time: " + str(astar_time) + "s")
+        if 'memory_net' in astar_stats:
+            print("Net RAM Allocation: " + str(astar_stats['memory_net']) + "kB")
         print("RAM Usage: " + str(astar_ram) + "kB\n")
 
     if results.ida:
         print("\nIterative Deepening A* algorithm called")
-        ida_arena, ida_cost, ida_nodes_expanded, ida_max_nodes_stored, ida_max_search_depth, ida_time, ida_ram = ida(
-            arena)
-        print("\n".join(ida_arena))
+        ida_stats = {}
+        ida_arena, ida_cost, ida_nodes_expanded, ida_max_nodes_stored, ida_max_search_depth, ida_time, ida_ram = measured_search(
+            ida_grid, search_grid['ida'], stats=ida_stats, **search_options['ida'])
+        show('ida', ida_arena, ida_cost)
         print("Iterative Deepening A*:")
         print("Cost: " + str(ida_cost))
         print("Nodes Expanded: " + str(ida_nodes_expanded))
         print("Max Nodes Stored: " + str(ida_max_nodes_stored))
         print("Max Search Depth: " + str(ida_max_search_depth))
+        print("Iterations: " + str(ida_stats['iterations']))
+        print("Pruned Cycles: " + str(ida_stats['pruned_in_path']))
+        print("Pruned Transpositions: " + str(ida_stats['pruned_transpositions']))
+        if results.exact:
+            print("Heuristic Cache: " + HEURISTIC_CACHE.report())
         print("Time: " + str(ida_time) + "s")
+        if 'memory_net' in ida_stats:
+            print("Net RAM Allocation: " + str(ida_stats['memory_net']) + "kB")
         print("RAM Usage: " + str(ida_ram) + "kB\n")
+
+    if results.jps:
+        print("\nJump Point Search algorithm called")
+        jps_stats = {}
+        jps_arena, jps_cost, jps_nodes_expanded, jps_max_nodes_stored, jps_max_search_depth, jps_time, jps_ram = measured_search(
+            jps_grid, search_grid['jps'], stats=jps_stats)
+        show('jps', jps_arena, jps_cost)
+        print("Jump Point Search:")
+        print("Cost: " + str(jps_cost))
+        print("Nodes Expanded: " + str(jps_nodes_expanded))
+        print("Jump Points: " + str(jps_stats['jump_points']))
+        print("Max Nodes Stored: " + str(jps_max_nodes_stored))
+        print("Max Search Depth: " + str(jps_max_search_depth))
+        print("Time: " + str(jps_time) + "s")
+        if 'memory_net' in jps_stats:
+            print("Net RAM Allocation: " + str(jps_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(jps_ram) + "kB\n")
+
+    if results.bibfs:
+        print("\nBidirectional BFS algorithm called")
+        bibfs_stats = {}
+        bibfs_arena, bibfs_cost, bibfs_nodes_expanded, bibfs_max_nodes_stored, bibfs_max_search_depth, bibfs_time, bibfs_ram = measured_search(
+            bibfs_grid, search_grid['bibfs'], stats=bibfs_stats)
+        show('bibfs', bibfs_arena, bibfs_cost)
+        print("Bidirectional BFS:")
+        print("Cost: " + str(bibfs_cost))
+        print("Nodes Expanded: " + str(bibfs_nodes_expanded))
+        print("Max Nodes Stored: " + str(bibfs_max_nodes_stored))
+        print("Max Search Depth: " + str(bibfs_max_search_depth))
+        print("Time: " + str(bibfs_time) + "s")
+        if 'memory_net' in bibfs_stats:
+            print("Net RAM Allocation: " + str(bibfs_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(bibfs_ram) + "kB\n")
+
+    if results.biastar:
+        print("\nBidirectional A* algorithm called")
+        biastar_stats = {}
+        biastar_arena, biastar_cost, biastar_nodes_expanded, biastar_max_nodes_stored, biastar_max_search_depth, biastar_time, biastar_ram = measured_search(
+            biastar_grid, search_grid['biastar'], stats=biastar_stats)
+        show('biastar', biastar_arena, biastar_cost)
+        print("Bidirectional A*:")
+        print("Cost: " + str(biastar_cost))
+        print("Nodes Expanded: " + str(biastar_nodes_expanded))
+        print("Max Nodes Stored: " + str(biastar_max_nodes_stored))
+        print("Max Search Depth: " + str(biastar_max_search_depth))
+        print("Time: " + str(biastar_time) + "s")
+        if 'memory_net' in biastar_stats:
+            print("Net RAM Allocation: " + str(biastar_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(biastar_ram) + "kB\n")
+
+    if results.wave:
+        print("\nWavefront BFS algorithm called")
+        wave_stats = {}
+        try:
+            import numpy  # Imported before the search so that it is not in its time and memory
+        except ImportError:
+            print("NumPy is needed for -wave")
+            exit()
+        wave_arena, wave_cost, wave_nodes_expanded, wave_max_nodes_stored, wave_max_search_depth, wave_time, wave_ram = measured_search(
+            wave_grid, search_grid['wave'], stats=wave_stats)
+        show('wave', wave_arena, wave_cost)
+        print("Wavefront BFS:")
+        print("Cost: " + str(wave_cost))
+        print("Nodes Expanded: " + str(wave_nodes_expanded))
+        print("Max Nodes Stored: " + str(wave_max_nodes_stored))
+        print("Max Search Depth: " + str(wave_max_search_depth))
+        print("Time: " + str(wave_time) + "s")
+        if 'memory_net' in wave_stats:
+            print("Net RAM Allocation: " + str(wave_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(wave_ram) + "kB\n")
+
+    if results.hpa:
+        print("\nHPA* algorithm called")
+        hpa_stats = {}
+        hpa_arena, hpa_cost, hpa_nodes_expanded, hpa_max_nodes_stored, hpa_max_search_depth, hpa_time, hpa_ram = measured_search(
+            hpa_grid, search_grid['hpa'], stats=hpa_stats, **search_options['hpa'])
+        hpa_optimal_cost = astar_grid(grid)[1]
+        show('hpa', hpa_arena, hpa_cost)
+        print("HPA*:")
+        print("Cost: " + str(hpa_cost))
+        print("Optimal Cost (A*): " + str(hpa_optimal_cost))
+        if hpa_optimal_cost > 0:
+            print("Suboptimality: " + str(round(100.0 * (hpa_cost - hpa_optimal_cost) / hpa_optimal_cost, 2)) + "%")
+        print("Nodes Expanded: " + str(hpa_nodes_expanded))
+        print("Max Nodes Stored: " + str(hpa_max_nodes_stored))
+        print("Max Search Depth: " + str(hpa_max_search_depth))
+        print("Abstract Graph: " + str(hpa_stats['abstract_nodes']) + " nodes, " + str(hpa_stats['abstract_edges'])
+              + " edges")
+        print("Graph Build Time: " + str(graph_time) + "s" + (" (loaded)" if hpa_graph_loaded else ""))
+        print("Time: " + str(hpa_time) + "s")
+        if 'memory_net' in hpa_stats:
+            print("Net RAM Allocation: " + str(hpa_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(hpa_ram) + "kB\n")
+
+    if results.ara:
+        print("\nARA* algorithm called")
+        ara_stats = {}
+        ara_arena, ara_cost, ara_nodes_expanded, ara_max_nodes_stored, ara_max_search_depth, ara_time, ara_ram = measured_search(
+            ara_grid, search_grid['ara'], stats=ara_stats, **search_options['ara'])
+        show('ara', ara_arena, ara_cost)
+        print("ARA*:")
+        print("Cost: " + str(ara_cost))
+        if 'bound' in ara_stats:
+            print("Suboptimality Bound: " + str(round(ara_stats['bound'], 3)) + ("" if ara_stats['optimal'] else
+                                                                                 " (stopped by the budget)"))
+        print("Iterations: " + str(ara_stats['iterations']) + ", Final Weight: " + str(ara_stats['weight']))
+        print("Nodes Expanded: " + str(ara_nodes_expanded))
+        print("Max Nodes Stored: " + str(ara_max_nodes_stored))
+        print("Max Search Depth: " + str(ara_max_search_depth))
+        print("Time: " + str(ara_time) + "s")
+        if 'memory_net' in ara_stats:
+            print("Net RAM Allocation: " + str(ara_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(ara_ram) + "kB\n")
+
+    if results.multibfs:
+        print("\nMulti-Source BFS algorithm called")
+        multibfs_stats = {}
+        multibfs_arena, multibfs_cost, multibfs_nodes_expanded, multibfs_max_nodes_stored, multibfs_max_search_depth, multibfs_time, multibfs_ram = measured_search(
+            multi_bfs_grid, search_grid['multibfs'], stats=multibfs_stats)
+        show('multibfs', multibfs_arena, multibfs_cost)
+        print("Multi-Source BFS:")
+        print("Sources: " + str(multibfs_stats['sources']) + ", Goals: " + str(multibfs_stats['goals']))
+        print("Cost: " + str(multibfs_cost))
+        if multibfs_cost != -1:
+            print("Nearest Goal: " + str(multibfs_arena.positions()[-1]))
+        print("Nodes Expanded: " + str(multibfs_nodes_expanded))
+        print("Max Nodes Stored: " + str(multibfs_max_nodes_stored))
+        print("Max Search Depth: " + str(multibfs_max_search_depth))
+        print("Time: " + str(multibfs_time) + "s")
+        if 'memory_net' in multibfs_stats:
+            print("Net RAM Allocation: " + str(multibfs_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(multibfs_ram) + "kB\n")
+
+    if results.dijkstra:
+        print("\nDijkstra algorithm called")
+        dijkstra_stats = {}
+        dijkstra_arena, dijkstra_cost, dijkstra_nodes_expanded, dijkstra_max_nodes_stored, dijkstra_max_search_depth, dijkstra_time, dijkstra_ram = measured_search(
+            dijkstra_grid, search_grid['dijkstra'], stats=dijkstra_stats, **search_options['dijkstra'])
+        show('dijkstra', dijkstra_arena, dijkstra_cost)
+        print("Dijkstra (" + str(results.connectivity) + "-connected):")
+        print("Cost: " + str(dijkstra_cost))
+        print("Nodes Expanded: " + str(dijkstra_nodes_expanded))
+        print("Max Nodes Stored: " + str(dijkstra_max_nodes_stored))
+        print("Max Search Depth: " + str(dijkstra_max_search_depth))
+        print("Time: " + str(dijkstra_time) + "s")
+        if 'memory_net' in dijkstra_stats:
+            print("Net RAM Allocation: " + str(dijkstra_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(dijkstra_ram) + "kB\n")
+
+    if results.terrain_astar:
+        print("\nTerrain A* algorithm called")
+        terrain_astar_stats = {}
+        terrain_astar_arena, terrain_astar_cost, terrain_astar_nodes_expanded, terrain_astar_max_nodes_stored, terrain_astar_max_search_depth, terrain_astar_time, terrain_astar_ram = measured_search(
+            terrain_astar_grid, search_grid['terrain_astar'], stats=terrain_astar_stats, **search_options['terrain_astar'])
+        show('terrain_astar', terrain_astar_arena, terrain_astar_cost)
+        print("Terrain A* (" + str(results.connectivity) + "-connected):")
+        print("Cost: " + str(terrain_astar_cost))
+        print("Nodes Expanded: " + str(terrain_astar_nodes_expanded))
+        print("Max Nodes Stored: " + str(terrain_astar_max_nodes_stored))
+        print("Max Search Depth: " + str(terrain_astar_max_search_depth))
+        print("Time: " + str(terrain_astar_time) + "s")
+        if 'memory_net' in terrain_astar_stats:
+            print("Net RAM Allocation: " + str(terrain_astar_stats['memory_net']) + "kB")
+        print("RAM Usage: " + str(terrain_astar_ram) + "kB\n")
+
+    if results.overlay:
+        write_overlay(grid, overlay_results, results.overlay, *overlay_window(overlay_results))
+        print("Wrote " + results.overlay)
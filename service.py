@@ -0,0 +1,259 @@
+'''
+Long running solver service for maze.py, so that queries no longer pay for a new interpreter, argparse and
+the parsing of the arena each time.
+
+    python3 service.py -socket /tmp/maze.sock -maps maps/ -workers 4
+    python3 service.py -port 8701 -cache-size 4096
+
+Clients send one JSON request per line and get one JSON line back per request, carrying the same "id":
+    {"id": 1, "arena_id": "arena1.txt", "algorithm": "astar", "start": [4, 3], "goal": [1, 2]}
+    {"id": 2, "arena": "  g \n os \n", "algorithm": "bfs"}
+    {"id": 3, "op": "stats"}
+Arenas are named by a file of the maps directory, or sent as text; a response then has the "arena_id"
+(the hash of the text) under which later requests can refer to it. The start and goal default to the
+'s' and 'g' of the arena itself. Responses are the records of maze.py's JSON output (cost, nodes expanded,
+start and run-length moves...) with "cached" set when they come from the solution cache.
+
+Arenas sent as text are written to map files and parsed in a thread, off the event loop. Searches run on a
+pool of worker processes, which load each map file once and get the endpoints with every query. Identical
+queries in flight are solved once, and solutions are kept in a least recently used cache keyed by (map
+file, algorithm, start, goal), the endpoints being the actual ones. Requests of one connection are answered as they complete.
+'''
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import maze
+
+# Grids a worker process has loaded, by map file, the least recently used one being dropped past WORKER_GRIDS
+_worker_grids = collections.OrderedDict()
+WORKER_GRIDS = 8
+
+
+def solve(path, algorithm, start, goal):
+    '''
+    Runs in a worker process: solves one query, from the start to the goal (row, col), on the map file of an
+    arena and returns its record
+    '''
+    grid = _worker_grids.get(path)
+    if grid is None:
+        grid = _worker_grids[path] = maze.load_grid(path)
+        if len(_worker_grids) > WORKER_GRIDS:
+            _worker_grids.popitem(last=False)
+    else:
+        _worker_grids.move_to_end(path)
+
+    maze.MEMORY_TRACKING = False
+    return maze.solution_record(algorithm, maze.ALGORITHMS[algorithm](grid.with_endpoints(start, goal)))
+
+
+def compile_arena(path, text=None):
+    '''
+    Runs in a thread of the service: writes an arena sent as text to the map file path unless it already
+    exists, then returns the (row, col) of the 's' and the 'g' of the map, None if missing. Map files keep
+    the text, so the digits of weighted terrain are still there for the workers.
+    '''
+    if text is not None and not os.path.exists(path):
+        # Written aside and renamed, so that a worker never reads half a file
+        temporary = "%s.%d" % (path, threading.get_ident())
+        with open(temporary, 'w') as f:
+            f.write(text)
+        os.replace(temporary, path)
+    grid = maze.load_grid(path)
+    return tuple(grid.position(cell) if cell != -1 else None for cell in (grid.start, grid.goal))
+
+
+class SolverService:
+    '''
+    The state of the service:
+    - Arenas (map file and default start and goal of every arena id, the name of a file of the maps
+      directory or the hash of an arena sent as text)
+    - Solutions (least recently used cache of the records of solved queries, up to cache_size)
+    - In flight (the future of every query being solved, that identical queries wait on)
+    - Statistics (request, hit, miss, coalesced and error counts, and the latencies of the last queries)
+    '''
+
+    def __init__(self, directory, maps=None, workers=1, cache_size=1024):
+        self.directory = directory
+        self.maps = maps
+        self.executor = concurrent.futures.ProcessPoolExecutor(workers)
+        self.arenas = {}
+        self.solutions = collections.OrderedDict()
+        self.cache_size = cache_size
+        self.in_flight = {}
+
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.latencies = collections.deque(maxlen=10000)
+
+    async def arena(self, request):
+        '''
+        Returns the (arena id, map file, start, goal) of the arena of a request, the start and goal being
+        the (row, col) of its own 's' and 'g'. Arenas are parsed and written in a thread, not in the event loop.
+        '''
+        if 'arena' in request:
+            text = request['arena']
+            arena_id = hashlib.sha256(text.encode()).hexdigest()
+            path = os.path.join(self.directory, arena_id + '.txt')
+        else:
+            arena_id = request['arena_id']
+            text = None
+            if arena_id in self.arenas:
+                return self.arenas[arena_id]
+            # Only files directly in the maps directory
+            if self.maps is None or os.path.basename(arena_id) != arena_id:
+                raise ValueError("Unknown arena " + arena_id)
+            path = os.path.join(self.maps, arena_id)
+
+        if arena_id not in self.arenas:
+            start, goal = await asyncio.get_running_loop().run_in_executor(None, compile_arena, path, text)
+            self.arenas[arena_id] = (arena_id, path, start, goal)
+        return self.arenas[arena_id]
+
+    async def solve(self, request):
+        '''
+        Returns the record of a query, from the cache, from an identical query in flight, or from a worker.
+        Queries are keyed by their map file and actual endpoints, the arena's own ones when none are given.
+        '''
+        arena_id, path, start, goal = await self.arena(request)
+        algorithm = request.get('algorithm', 'astar')
+        if algorithm not in maze.ALGORITHMS:
+            raise ValueError("Unknown algorithm " + str(algorithm))
+        start = tuple(request['start']) if 'start' in request else start
+        goal = tuple(request['goal']) if 'goal' in request else goal
+        if start is None or goal is None:
+            raise ValueError("The arena has no %s, give one in the request" % ('start' if start is None else 'goal'))
+
+        key = (path, algorithm, start, goal)
+        record = self.solutions.get(key)
+        if record is not None:
+            self.hits += 1
+            self.solutions.move_to_end(key)
+            return dict(record, arena_id=arena_id, cached=True)
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            record = await asyncio.shield(future)
+        else:
+            self.misses += 1
+            future = asyncio.get_running_loop().run_in_executor(self.executor, solve, path, algorithm, start, goal)
+            self.in_flight[key] = future
+            try:
+                record = await future
+            finally:
+                del self.in_flight[key]
+            self.solutions[key] = record
+            if len(self.solutions) > self.cache_size:
+                self.solutions.popitem(last=False)
+        return dict(record, arena_id=arena_id, cached=False)
+
+    def stats(self):
+        '''
+        Returns the counters, the cache hit rate (of the queries that reached the cache, coalesced ones
+        counting as misses) and the latency percentiles (ms) of the last queries
+        '''
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        queries = self.hits + self.coalesced + self.misses
+        return {
+            'requests': self.requests,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'hit_rate': self.hits / queries if queries else 0.0,
+            'cached_solutions': len(self.solutions),
+            'arenas': len(self.arenas),
+            'in_flight': len(self.in_flight),
+            'latency_ms': {'p50': percentile(0.5), 'p90': percentile(0.9), 'p99': percentile(0.99),
+                           'max': percentile(1.0)},
+        }
+
+    async def respond(self, line, writer):
+        '''
+        Answers one request line, errors included. Stats requests are not counted as requests.
+        '''
+        begin_time = time.perf_counter()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if isinstance(request, dict) and request.get('op') == 'stats':
+            response = self.stats()
+        else:
+            self.requests += 1
+            try:
+                if not isinstance(request, dict):
+                    raise ValueError("Requests are JSON objects on one line")
+                response = await self.solve(request)
+                self.latencies.append(time.perf_counter() - begin_time)
+            except Exception as error:
+                self.errors += 1
+                response = {'error': "%s: %s" % (type(error).__name__, error)}
+        if isinstance(request, dict) and 'id' in request:
+            response['id'] = request['id']
+        writer.write((json.dumps(response) + "\n").encode())
+        await writer.drain()
+
+    async def serve_client(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(self.respond(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+
+async def serve(arguments):
+    with tempfile.TemporaryDirectory() as directory:
+        service = SolverService(directory, arguments.maps, arguments.workers, arguments.cache_size)
+        try:
+            if arguments.port is not None:
+                server = await asyncio.start_server(service.serve_client, '127.0.0.1', arguments.port)
+            else:
+                server = await asyncio.start_unix_server(service.serve_client, arguments.socket)
+            print("Serving on " + (arguments.socket if arguments.port is None else "127.0.0.1:%d" % arguments.port),
+                  flush=True)
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve maze.py searches over a local socket')
+    parser.add_argument('-socket', default='/tmp/maze-solver.sock', help="Unix socket to listen on")
+    parser.add_argument('-port', type=int, help="Listen on this TCP port of 127.0.0.1 instead of a Unix socket")
+    parser.add_argument('-maps', help="Directory of the map files that requests can name as arena_id")
+    parser.add_argument('-workers', type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    parser.add_argument('-cache-size', type=int, default=1024, help="Number of solutions kept in the cache")
+    arguments = parser.parse_args()
+
+    try:
+        asyncio.run(serve(arguments))
+    except KeyboardInterrupt:
+        pass